@@ -1,23 +1,133 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.chat import ChatRequest, ChatResponse
-from app.services.prompt_builder import build_chat_prompt
-from app.services.clova_client import call_clova_chat
+import json
+from contextlib import aclosing
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.schemas.chat import (
+    ChatRequest, ChatResponse,
+    ChatSessionCreateRequest, ChatSessionCreateResponse,
+)
+from app.services.prompt_builder import PromptTokenStats, build_chat_prompt_with_stats
+from app.services.clova_client import call_clova, stream_clova
+from app.services.chat_sessions import ChatSession, session_store
+from app.services.upstream_scheduler import UpstreamBusyError
+from app.services.circuit_breaker import CircuitOpenError, BREAKER_OPEN_SEC
+from app.services.tracing import stage
 
 router = APIRouter()
 
+# 서킷 open(업스트림 장애) 시 안내 문구
+CHAT_UNAVAILABLE_DETAIL = "AI 대화 서버가 일시적으로 불안정합니다. 잠시 후 다시 시도해 주세요."
+
+def _load_session(request: ChatRequest) -> ChatSession | None:
+    if request.session_id is None:
+        return None
+    session = session_store.get(request.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="세션이 없거나 만료되었습니다.")
+    return session
+
+def _build_messages(
+    request: ChatRequest, session: ChatSession | None
+) -> tuple[list[dict], PromptTokenStats]:
+    if session is not None:
+        # 세션 모드: 서버가 보관한 히스토리(dict) 그대로 사용
+        return build_chat_prompt_with_stats(
+            topic=session.topic,
+            history=session.history,
+            user_input=request.user_input
+        )
+    history = [
+        msg.model_dump()
+        for msg in request.history
+    ]
+    return build_chat_prompt_with_stats(
+        topic=request.topic,
+        history=history,
+        user_input=request.user_input
+    )
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/sessions", response_model=ChatSessionCreateResponse)
+async def create_chat_session(request: ChatSessionCreateRequest):
+    session = session_store.create(request.topic.value)
+    return ChatSessionCreateResponse(session_id=session.session_id, topic=session.topic)
+
+@router.delete("/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="세션이 없거나 만료되었습니다.")
+    return {"deleted": session_id}
+
 @router.post("", response_model=ChatResponse)
 async def chat_with_ai(request: ChatRequest):
+    session = _load_session(request)
     try:
-        history = [
-            msg.model_dump()
-            for msg in request.history
-        ]
-        messages = build_chat_prompt(
-            topic=request.topic,
-            history=history,
-            user_input=request.user_input
+        with stage("chat_prompt"):
+            messages, token_stats = _build_messages(request, session)
+        with stage("chat_upstream"):
+            ai_response = (await call_clova(messages, endpoint="chat")).strip()
+    except CircuitOpenError:
+        raise HTTPException(
+            status_code=503,
+            detail=CHAT_UNAVAILABLE_DETAIL,
+            headers={"Retry-After": str(int(BREAKER_OPEN_SEC))},
         )
-        ai_response = await call_clova_chat(messages)
-        return ChatResponse(ai_response=ai_response.strip())
+    except UpstreamBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if session is not None:
+        session.append_turn(request.user_input, ai_response)
+    return ChatResponse(
+        ai_response=ai_response,
+        session_id=request.session_id,
+        prompt_tokens_before=token_stats.tokens_before,
+        prompt_tokens_after=token_stats.tokens_after,
+    )
+
+@router.post("/stream")
+async def chat_with_ai_stream(request: ChatRequest, http_request: Request):
+    """
+    토큰 단위 SSE 스트리밍
+    - event: token  → {"token": "..."}
+    - event: done   → {"ai_response": "...", "session_id": ..., "prompt_tokens_*": ...} (전체 문장)
+    - event: error  → {"detail": "..."}
+    클라이언트 연결이 끊기면 업스트림 스트림을 즉시 닫는다.
+    """
+    session = _load_session(request)
+    try:
+        with stage("chat_prompt"):
+            messages, token_stats = _build_messages(request, session)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def event_stream():
+        parts: list[str] = []
+        try:
+            async with aclosing(stream_clova(messages, endpoint="chat")) as tokens:
+                async for token in tokens:
+                    if await http_request.is_disconnected():
+                        return
+                    parts.append(token)
+                    yield _sse("token", {"token": token})
+            ai_response = "".join(parts).strip()
+            if session is not None:
+                session.append_turn(request.user_input, ai_response)
+            yield _sse("done", {
+                "ai_response": ai_response,
+                "session_id": request.session_id,
+                "prompt_tokens_before": token_stats.tokens_before,
+                "prompt_tokens_after": token_stats.tokens_after,
+            })
+        except CircuitOpenError:
+            yield _sse("error", {"detail": CHAT_UNAVAILABLE_DETAIL})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
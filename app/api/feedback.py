@@ -1,31 +1,89 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.feedback import FeedbackRequest, FeedbackResponse, FeedbackAnalysis
-from app.services.feedback_logic import analyze_feedback_with_segments
+import asyncio
+import json
+import os
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from app.schemas.feedback import (
+    FeedbackRequest, FeedbackResponse, FeedbackAnalysis,
+    FeedbackBatchRequest, FeedbackBatchResponse, FeedbackBatchItem,
+    FeedbackStreamProgress, FeedbackJobRequest, FeedbackJobStatus, Segment,
+)
+from app.services.feedback_logic import (
+    SegmentAccumulator, WordTable, analyze_feedback_with_segments, analyze_feedback_from_accumulator,
+)
 from app.services.prompt_builder import build_feedback_messages
-from app.services.clova_client import call_clova_studio
+from app.services.feedback_templates import produce_feedback_text
+from app.services.upstream_scheduler import UpstreamBusyError
+from app.services.tracing import stage
+from app.services import analysis_log
+from app.services.feedback_jobs import IdempotencyKeyMismatchError, body_digest, job_queue
 
 router = APIRouter()
 
-@router.post("", response_model=FeedbackResponse)
-async def generate_feedback(req: FeedbackRequest) -> FeedbackResponse:
+# 배치 요청에서 동시에 진행할 업스트림 호출 수
+BATCH_CONCURRENCY = int(os.getenv("FEEDBACK_BATCH_CONCURRENCY", "8"))
+
+# 스트리밍 분석 한 연결에서 받을 최대 단어 수
+STREAM_MAX_WORDS = int(os.getenv("FEEDBACK_STREAM_MAX_WORDS", "2000"))
+
+def _load_body(body: bytes) -> dict:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="JSON 본문을 해석할 수 없습니다.")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=422, detail="본문은 JSON 객체여야 합니다.")
+    return data
+
+def _parse_feedback_body(body: bytes) -> tuple[str, str, WordTable]:
     """
-    segments 기반으로 정확도/속도/공백을 분석하고, 짧은 피드백 문장을 생성해 반환.
+    요청 본문을 한 번만 훑어 (target_text, result_text, WordTable) 구성
+    - 단어마다 WordItem 객체/ dict를 만들지 않음 (긴 낭독에서 pydantic 변환 비용 제거)
+    - 검증 규칙은 FeedbackRequest와 같음 (실패 시 422)
     """
+    return _parse_feedback_data(_load_body(body))
+
+def _parse_feedback_data(data: dict) -> tuple[str, str, WordTable]:
+    target_text, result_text = data.get("target_text"), data.get("result_text")
+    if not isinstance(target_text, str) or not isinstance(result_text, str):
+        raise HTTPException(status_code=422, detail="target_text와 result_text는 문자열이어야 합니다.")
+    if "segments" not in data:
+        raise HTTPException(status_code=422, detail="segments가 필요합니다.")
     try:
-        if not req.segments:
-            raise HTTPException(status_code=400, detail="segments가 비어 있습니다.")
+        table = WordTable.from_segments(data["segments"], strict=True)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not data["segments"]:
+        raise HTTPException(status_code=400, detail="segments가 비어 있습니다.")
+    return target_text, result_text, table
 
-        # 1) 내부 분석
+def _analyze(req: FeedbackRequest) -> tuple[dict, list[dict]]:
+    """
+    내부 분석 + 프롬프트 구성 (업스트림 호출 전까지의 로컬 단계)
+    """
+    if not req.segments:
+        raise HTTPException(status_code=400, detail="segments가 비어 있습니다.")
+    return _analyze_segments(req.target_text, req.result_text, [s.model_dump() for s in req.segments])
+
+def _analyze_segments(
+    target_text: str, result_text: str, segments: list[dict] | WordTable
+) -> tuple[dict, list[dict]]:
+    # 1) 내부 분석
+    with stage("feedback_analysis"):
         analysis_dict = analyze_feedback_with_segments(
-            target_text=req.target_text,
-            result_text=req.result_text,
-            user_segments=[s.model_dump() for s in req.segments],
+            target_text=target_text,
+            result_text=result_text,
+            user_segments=segments,
         )
 
-        # 2) 프롬프트 구성
-        messages = build_feedback_messages(
-            target_text=req.target_text,
-            result_text=req.result_text,
+    # 2) 프롬프트 구성 (분석 기록은 요청이 받아들여진 뒤 라우트에서 남김)
+    return analysis_dict, _build_messages(target_text, result_text, analysis_dict)
+
+def _build_messages(target_text: str, result_text: str, analysis_dict: dict) -> list[dict]:
+    with stage("feedback_prompt"):
+        return build_feedback_messages(
+            target_text=target_text,
+            result_text=result_text,
             issue=analysis_dict["issue"],
             accuracy_ok=analysis_dict["accuracy_ok"],
             speed=analysis_dict["speed"],
@@ -33,15 +91,247 @@ async def generate_feedback(req: FeedbackRequest) -> FeedbackResponse:
             wpm_user=analysis_dict["wpm_user"],
         )
 
-        # 3) Clova Studio 호출 → 피드백 문장 생성
-        feedback_text = await call_clova_studio(messages)
-        feedback_text = feedback_text.strip().replace("\n", " ")
+async def _respond(analysis_dict: dict, messages: list[dict]) -> FeedbackResponse:
+    # 3) 피드백 문장 생성 (FEEDBACK_MODE에 따라 Clova Studio 또는 템플릿)
+    with stage("feedback_text"):
+        feedback_text, source = await produce_feedback_text(
+            messages,
+            issue=analysis_dict["issue"],
+            wpm_user=analysis_dict["wpm_user"],
+        )
 
-        # 4) 응답 구성
+    # 4) 응답 구성
+    with stage("feedback_response"):
         analysis = FeedbackAnalysis(**analysis_dict)
-        return FeedbackResponse(feedback_text=feedback_text, analysis=analysis)
+        return FeedbackResponse(feedback_text=feedback_text, analysis=analysis, source=source)
+
+@router.post(
+    "",
+    response_model=FeedbackResponse,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/FeedbackRequest"}}},
+    }},
+)
+async def generate_feedback(request: Request) -> FeedbackResponse:
+    """
+    segments 기반으로 정확도/속도/공백을 분석하고, 짧은 피드백 문장을 생성해 반환.
+    (본문 스키마는 FeedbackRequest, 파싱은 _parse_feedback_body의 빠른 경로)
+    """
+    try:
+        with stage("feedback_ingest"):
+            target_text, result_text, table = _parse_feedback_body(await request.body())
+        analysis_dict, messages = _analyze_segments(target_text, result_text, table)
+        response = await _respond(analysis_dict, messages)
+        analysis_log.record(analysis_dict)
+        return response
 
     except HTTPException:
         raise
+    except UpstreamBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post(
+    "/jobs",
+    status_code=202,
+    response_model=FeedbackJobStatus,
+    openapi_extra={"requestBody": {
+        "required": True,
+        # 다른 라우트가 쓰지 않는 모델이라 components에 없음 → 인라인 (Segment 등은 components 참조)
+        "content": {"application/json": {"schema": {
+            k: v for k, v in FeedbackJobRequest.model_json_schema(
+                ref_template="#/components/schemas/{model}").items() if k != "$defs"
+        }}},
+    }},
+)
+async def submit_feedback_job(
+    request: Request,
+    response: Response,
+    idempotency_key: str | None = Header(None, max_length=200),
+) -> FeedbackJobStatus:
+    """
+    로컬 분석까지 마치고 job_id를 바로 반환 (피드백 문장은 워커가 생성)
+    - 결과: GET /jobs/{job_id}?wait=초 (롱폴링) 또는 callback_url로 POST
+    - 같은 Idempotency-Key + 같은 본문으로 다시 제출하면 기존 작업 반환 (분석/업스트림 호출 반복 없음),
+      같은 키에 다른 본문이면 422
+    (본문 스키마는 FeedbackJobRequest)
+    """
+    try:
+        body = await request.body()
+        body_hash = body_digest(body)
+        job = job_queue.find(idempotency_key, body_hash)
+        if job is None:
+            with stage("feedback_ingest"):
+                data = _load_body(body)
+                callback_url = data.get("callback_url")
+                if callback_url is not None and not isinstance(callback_url, str):
+                    raise HTTPException(status_code=422, detail="callback_url은 문자열이어야 합니다.")
+                job_queue.admit(callback_url)  # 거절될 제출은 단어 표 구성/분석 전에 끝냄
+                target_text, result_text, table = _parse_feedback_data(data)
+            analysis_dict, messages = _analyze_segments(target_text, result_text, table)
+            job = job_queue.submit(
+                analysis_dict, messages,
+                body_hash=body_hash, callback_url=callback_url, idempotency_key=idempotency_key,
+            )
+            if job.analysis is analysis_dict:  # 새로 접수된 작업만 (같은 키의 기존 작업이면 기록 안 함)
+                analysis_log.record(analysis_dict)
+        response.headers["Location"] = f"{request.url.path}/{job.job_id}"
+        return FeedbackJobStatus(**job.view())
+
+    except HTTPException:
+        raise
+    except (ValueError, IdempotencyKeyMismatchError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except UpstreamBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=FeedbackJobStatus)
+async def get_feedback_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="완료될 때까지 기다릴 최대 시간(s, 롱폴링)"),
+) -> FeedbackJobStatus:
+    """
+    작업 상태/결과 조회 (완료 후 FEEDBACK_JOBS_TTL이 지나면 404)
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 없거나 보관 기간이 지났습니다.")
+    await job_queue.wait(job, wait)
+    return FeedbackJobStatus(**job.view())
+
+@router.post("/batch", response_model=FeedbackBatchResponse)
+async def generate_feedback_batch(req: FeedbackBatchRequest) -> FeedbackBatchResponse:
+    """
+    한 레슨의 발화 여러 개를 한 번에 채점.
+    - 로컬 분석은 전체 항목을 먼저 한 번에 수행
+    - 업스트림 호출은 BATCH_CONCURRENCY 이내로 동시 진행
+    - 항목별 실패는 해당 항목의 error로만 기록 (배치 전체는 실패하지 않음)
+    """
+    results: list[FeedbackBatchItem] = [FeedbackBatchItem(index=i) for i in range(len(req.items))]
+
+    # 1~2) 로컬 분석 일괄 수행
+    prepared: list[tuple[int, dict, list[dict]]] = []
+    for i, item in enumerate(req.items):
+        try:
+            analysis_dict, messages = _analyze(item)
+            prepared.append((i, analysis_dict, messages))
+        except HTTPException as e:
+            results[i].error = str(e.detail)
+        except Exception as e:
+            results[i].error = str(e)
+
+    # 3~4) 업스트림 호출 fan-out (동시성 제한)
+    semaphore = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+
+    async def run(i: int, analysis_dict: dict, messages: list[dict]) -> None:
+        async with semaphore:
+            try:
+                results[i].result = await _respond(analysis_dict, messages)
+            except Exception as e:
+                results[i].error = str(e)
+            else:
+                analysis_log.record(analysis_dict)
+
+    await asyncio.gather(*(run(i, a, m) for i, a, m in prepared))
+    return FeedbackBatchResponse(results=results)
+
+async def _receive_json(websocket: WebSocket) -> object:
+    """
+    텍스트 프레임의 JSON 메시지 하나 수신
+    - 바이너리 프레임/잘못된 JSON은 ValueError (핸들러가 1003으로 종료)
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    text = message.get("text")
+    if text is None:
+        raise ValueError("바이너리 프레임은 받을 수 없습니다.")
+    return json.loads(text)
+
+@router.websocket("/stream")
+async def stream_feedback(websocket: WebSocket) -> None:
+    """
+    STT가 세그먼트/단어를 내보내는 대로 받아 누적 분석 (발화가 끝나기 전부터 분석 진행)
+    클라이언트 → 서버:
+      {"type": "start", "target_text": "..."}                      (처음 한 번)
+      {"type": "segment", "segment": {start, end, words}}
+      {"type": "words", "words": [[start, end, "token"], ...]}
+      {"type": "final", "result_text": "...", "segment": {...}}    (둘 다 선택)
+    서버 → 클라이언트:
+      progress (잠정 speed/gaps) → final 수신 시 analysis 즉시 → 피드백 문장 포함 result
+      오류는 {"type": "error", "detail", "status"}
+    """
+    await websocket.accept()
+
+    async def send_error(detail: str, status: int) -> None:
+        await websocket.send_json({"type": "error", "detail": detail, "status": status})
+
+    try:
+        first = await _receive_json(websocket)
+        if not isinstance(first, dict) or first.get("type") != "start" or not isinstance(first.get("target_text"), str):
+            await send_error("첫 메시지는 target_text를 담은 start여야 합니다.", 400)
+            await websocket.close(code=1008)
+            return
+
+        target_text = first["target_text"]
+        acc = SegmentAccumulator()
+        while True:
+            msg = await _receive_json(websocket)
+            kind = msg.get("type") if isinstance(msg, dict) else None
+            try:
+                if kind in ("segment", "final") and msg.get("segment") is not None:
+                    acc.add_segment(Segment.model_validate(msg["segment"]).model_dump())
+                elif kind == "words":
+                    words = Segment.model_validate({"start": 0, "end": 0, "words": msg.get("words")}).model_dump()["words"]
+                    acc.add_words(words)
+                elif kind != "final":
+                    await send_error(f"알 수 없는 메시지 type: {kind}", 400)
+                    continue
+            except ValidationError as e:
+                await send_error(str(e), 422)
+                continue
+
+            if acc.n_words > STREAM_MAX_WORDS:
+                await send_error(f"단어 수가 {STREAM_MAX_WORDS}개를 넘었습니다.", 413)
+                await websocket.close(code=1009)
+                return
+            if kind != "final":
+                await websocket.send_json(FeedbackStreamProgress(**acc.provisional()).model_dump())
+                continue
+
+            # 마지막 세그먼트: 누적값으로 바로 판정 (일괄 재계산 없음)
+            if acc.n_words == 0:
+                await send_error("segments가 비어 있습니다.", 400)
+                await websocket.close(code=1008)
+                return
+            result_text = msg.get("result_text")
+            if not isinstance(result_text, str):
+                result_text = acc.hypothesis_text()
+            with stage("feedback_analysis"):
+                analysis_dict = analyze_feedback_from_accumulator(
+                    target_text=target_text, acc=acc, result_text=result_text,
+                )
+            await websocket.send_json({"type": "analysis", "analysis": FeedbackAnalysis(**analysis_dict).model_dump()})
+
+            messages = _build_messages(target_text, result_text, analysis_dict)
+            try:
+                response = await _respond(analysis_dict, messages)
+            except UpstreamBusyError as e:
+                await send_error(str(e), 503)
+            except Exception as e:
+                await send_error(str(e), 500)
+            else:
+                analysis_log.record(analysis_dict)
+                await websocket.send_json({"type": "result", **response.model_dump()})
+            await websocket.close()
+            return
+
+    except WebSocketDisconnect:
+        return
+    except ValueError:
+        await send_error("텍스트 프레임의 JSON 메시지만 받을 수 있습니다.", 400)
+        await websocket.close(code=1003)
@@ -1,15 +1,19 @@
 from fastapi import APIRouter, HTTPException
 from app.schemas.learning import LearningRequest, LearningResponse
-from app.services.prompt_builder import build_learning_prompts
-from app.services.clova_client import call_clova_studio
+from app.services.learning_pool import get_learning_item
+from app.services.upstream_scheduler import UpstreamBusyError
+from app.services.tracing import stage
 
 router = APIRouter()
 
 @router.post("", response_model=LearningResponse)
 async def generate_learning_content(request: LearningRequest):
     try:
-        messages = build_learning_prompts(request.type)
-        result = await call_clova_studio(messages)
-        return LearningResponse(result=result.strip())
+        # 사전 생성 풀에서 꺼냄 (비어 있으면 Clova 직접 호출)
+        with stage("learning_item"):
+            result = await get_learning_item(request.type)
+        return LearningResponse(result=result)
+    except UpstreamBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
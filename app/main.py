@@ -1,7 +1,45 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.api import learning, chat, feedback
+from app.services import analysis_log, clova_client, feedback_jobs, learning_pool, tracing, warmup
+from app.services.response_cache import response_cache
+from app.services.singleflight import single_flight
+from app.services.upstream_scheduler import scheduler
+from app.services.hedging import hedge_stats
+from app.services.circuit_breaker import breaker_stats
+from app.services.model_router import routing_stats
+from app.services.chat_sessions import session_store
+from app.services.prompt_registry import prompt_registry
+from app.services.metrics import MetricsMiddleware, render_metrics
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 업스트림(Clova) 공유 커넥션 풀 생성/정리
+    await clova_client.start_client()
+    # 학습 콘텐츠 사전 생성 풀 보충 시작
+    await learning_pool.start_pools()
+    # 비동기 피드백 작업 워커 시작
+    await feedback_jobs.start_jobs()
+    # 커넥션/CPU 경로 워밍업 (완료 전까지 /ready는 503)
+    await warmup.start_warmup()
+    try:
+        yield
+    finally:
+        await warmup.stop_warmup()
+        await learning_pool.stop_pools()
+        # 새 작업을 막고 남은 작업(업스트림 호출 포함)을 마무리
+        await feedback_jobs.stop_jobs()
+        # 진행 중인 업스트림 호출을 마무리한 뒤 커넥션 정리
+        await clova_client.drain()
+        await clova_client.close_client()
+        analysis_log.close()
+        tracing.flush()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+# 가장 바깥: Server-Timing 헤더 + 샘플링한 트레이스 파일 내보내기
+app.add_middleware(tracing.TracingMiddleware)
 
 app.include_router(learning.router, prefix="/api/learning")
 app.include_router(chat.router, prefix="/api/chat")
@@ -10,3 +48,33 @@ app.include_router(feedback.router, prefix="/api/feedback")
 @app.get("/")
 def root():
     return {"message": "AI 서버 실행 중"}
+
+@app.get("/ready")
+def ready():
+    # 로드밸런서 헬스체크용: 워밍업이 끝난 인스턴스만 200
+    status = warmup.state.stats()
+    return JSONResponse(status, status_code=200 if warmup.is_ready() else 503)
+
+@app.get("/stats")
+def stats():
+    return {
+        "http_pool": clova_client.pool_stats(),
+        "learning_pool": learning_pool.pool_stats(),
+        "response_cache": response_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "upstream_scheduler": scheduler.stats(),
+        "hedging": hedge_stats(),
+        "circuit_breaker": breaker_stats(),
+        "model_routing": routing_stats(),
+        "chat_sessions": session_store.stats(),
+        "prompt_tokens": prompt_registry.token_report(),
+        "warmup": warmup.state.stats(),
+        "analysis_log": analysis_log.log_stats(),
+        "feedback_jobs": feedback_jobs.jobs_stats(),
+        "tracing": tracing.tracing_stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus 텍스트 형식 (text/plain; version=0.0.4)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
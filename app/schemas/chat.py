@@ -1,14 +1,32 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import List, Optional
+from app.constants.topics import Topic
 
 class Message(BaseModel):
     role: str  # "user" or "assistant"
     content: str
 
 class ChatRequest(BaseModel):
-    topic: str
+    topic: Optional[Topic] = None      # 세션 모드에서는 생략 가능 (세션의 topic 사용)
     user_input: Optional[str] = None
-    history: List[Message] = []
+    history: List[Message] = []        # 세션 모드에서는 무시 (서버가 보관)
+    session_id: Optional[str] = None   # 있으면 서버 측 세션 히스토리 사용
+
+    @model_validator(mode="after")
+    def _require_topic_or_session(self):
+        if self.session_id is None and self.topic is None:
+            raise ValueError("topic 또는 session_id 중 하나는 필요합니다.")
+        return self
 
 class ChatResponse(BaseModel):
     ai_response: str
+    session_id: Optional[str] = None
+    prompt_tokens_before: Optional[int] = None  # 히스토리 압축 전 추정 토큰 수
+    prompt_tokens_after: Optional[int] = None   # 히스토리 압축 후 추정 토큰 수
+
+class ChatSessionCreateRequest(BaseModel):
+    topic: Topic
+
+class ChatSessionCreateResponse(BaseModel):
+    session_id: str
+    topic: Topic
@@ -41,6 +41,7 @@ class Segment(BaseModel):
 
 SpeedLabel = Literal["fast", "slow", "ok"]
 IssueLabel = Literal["accuracy", "speed_fast", "speed_slow", "gaps", "good"]
+FeedbackSource = Literal["llm", "template", "fallback"]
 
 class FeedbackRequest(BaseModel):
     """
@@ -70,3 +71,56 @@ class FeedbackAnalysis(BaseModel):
 class FeedbackResponse(BaseModel):
     feedback_text: str
     analysis: FeedbackAnalysis
+    source: FeedbackSource = Field("llm", description="피드백 문장 생성 경로 (llm | template | fallback)")
+
+# ===== 배치 요청/응답 =====
+
+class FeedbackBatchRequest(BaseModel):
+    """
+    한 레슨 단위 일괄 피드백 요청
+    """
+    items: List[FeedbackRequest] = Field(..., min_length=1, max_length=100, description="발화별 피드백 요청")
+
+class FeedbackBatchItem(BaseModel):
+    index: int = Field(..., description="요청 items 내 위치")
+    result: FeedbackResponse | None = None
+    error: str | None = None
+
+class FeedbackBatchResponse(BaseModel):
+    results: List[FeedbackBatchItem]
+
+# ===== 비동기 작업 =====
+
+FeedbackJobState = Literal["queued", "running", "done"]
+CallbackState = Literal["pending", "delivered", "failed"]
+
+class FeedbackJobRequest(FeedbackRequest):
+    """
+    비동기 피드백 작업 제출 (FeedbackRequest + 선택적 콜백)
+    """
+    callback_url: str | None = Field(None, description="완료 시 결과(FeedbackJobStatus)를 POST할 URL (서버의 허용 호스트만)")
+
+class FeedbackJobStatus(BaseModel):
+    job_id: str
+    status: FeedbackJobState
+    analysis: FeedbackAnalysis = Field(..., description="제출 시점에 끝난 로컬 분석")
+    result: FeedbackResponse | None = Field(None, description="status가 done일 때 채워짐")
+    created_at: float = Field(..., description="제출 시각(unix s)")
+    finished_at: float | None = None
+    callback: CallbackState | None = Field(None, description="콜백 전달 상태 (callback_url이 있을 때)")
+
+# ===== 스트리밍(WebSocket) 메시지 =====
+
+class FeedbackStreamProgress(BaseModel):
+    """
+    발화 도중 잠정 상태 (세그먼트/단어 수신 때마다 전송)
+    """
+    type: Literal["progress"] = "progress"
+    speed: SpeedLabel
+    gaps: bool
+    wpm_user: float
+    pause_ms: int
+    longest_pause_ms: int
+    total_ms: int
+    speech_ms: int
+    n_words: int
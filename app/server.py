@@ -0,0 +1,209 @@
+# ------------------------------------------------------------
+# 서버 실행 진입점
+#   python -m app.server            # 운영: 멀티 워커, uvloop/httptools(설치 시), graceful shutdown
+#   python -m app.server --reload   # 개발: 단일 워커 + 코드 변경 시 재시작 (기존 uvicorn --reload)
+#
+# - 워커 수: 기본 1개. 응답 캐시, 대화 세션, 피드백 작업 등이 워커별 메모리에 있어서
+#   후속 요청(session_id 대화, 작업 폴링)이 다른 워커로 가면 404가 나기 때문
+#   앞단이 sticky 라우팅이면 SERVER_STICKY_ROUTING=1 → WEB_CONCURRENCY 또는 코어 수(affinity, cgroup 쿼터 반영)
+#   sticky 없이 2개 이상을 요청하면 시작 시 오류로 종료
+# - gunicorn(+uvicorn-worker)으로 preload_app: 앱을 마스터에서 한 번 로드한 뒤 fork
+#   (개발 환경에 없으면 uvicorn 멀티프로세스: 마스터에서 import만 먼저 확인하고 워커가 각자 로드)
+# - 종료 신호(SIGTERM) 시 새 연결을 받지 않고 진행 중 요청을 SERVER_GRACEFUL_TIMEOUT까지 기다림
+#   → lifespan 종료 단계에서 업스트림 호출 drain 후 공유 클라이언트 정리
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import importlib.util
+import logging
+import math
+import os
+from pathlib import Path
+
+APP_PATH = "app.main:app"
+
+logger = logging.getLogger("uvicorn.error")
+
+# ===================== 튜닝 가능한 설정 =====================
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_WORKERS = os.getenv("WEB_CONCURRENCY")                                # 지정 시 자동 산정 대신 사용
+SERVER_STICKY_ROUTING = os.getenv("SERVER_STICKY_ROUTING", "0") == "1"        # 앞단이 클라이언트별로 같은 워커로 보냄
+SERVER_WORKERS_PER_CORE = float(os.getenv("SERVER_WORKERS_PER_CORE", "1"))    # 비동기 I/O 위주라 코어당 1
+SERVER_MAX_WORKERS = int(os.getenv("SERVER_MAX_WORKERS", "16"))
+SERVER_GRACEFUL_TIMEOUT = float(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))   # 진행 중 요청 대기(s)
+SERVER_KEEPALIVE = float(os.getenv("SERVER_KEEPALIVE", "5"))                  # 클라이언트 keep-alive(s)
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+
+# =============================================================
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def _cgroup_cpu_limit() -> float | None:
+    """
+    컨테이너 CPU 쿼터(코어 수) 조회. 제한이 없거나 알 수 없으면 None
+    - cgroup v2: /sys/fs/cgroup/cpu.max ("max 100000" | "200000 100000")
+    - cgroup v1: cpu.cfs_quota_us / cpu.cfs_period_us (quota -1 = 제한 없음)
+    """
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """
+    이 프로세스가 실제로 쓸 수 있는 코어 수 (CPU affinity와 cgroup 쿼터 중 작은 값)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS 등
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return max(1, cpus)
+
+
+def worker_count(requested: int | None = None) -> int:
+    """
+    실행할 워커 수
+    - sticky 라우팅이 아니면 1 (2개 이상을 명시하면 SystemExit)
+    - sticky 라우팅이면 requested → WEB_CONCURRENCY → 코어 수 기준 자동
+    """
+    if requested is None and SERVER_WORKERS:
+        requested = int(SERVER_WORKERS)
+    if not SERVER_STICKY_ROUTING:
+        if requested is not None and requested > 1:
+            raise SystemExit(
+                f"워커 {requested}개를 요청했지만 SERVER_STICKY_ROUTING=1이 아닙니다. "
+                "대화 세션/피드백 작업은 워커별 메모리에 있어 후속 요청이 다른 워커로 가면 404가 납니다. "
+                "앞단에서 sticky 라우팅을 설정한 뒤 SERVER_STICKY_ROUTING=1로 실행하세요."
+            )
+        return 1
+    if requested is not None:
+        return max(1, requested)
+    return max(1, min(SERVER_MAX_WORKERS, int(available_cpus() * SERVER_WORKERS_PER_CORE)))
+
+
+def _can_preload() -> bool:
+    return _has_module("gunicorn") and _has_module("uvicorn_worker")
+
+
+def _loop_impl() -> str:
+    return "uvloop" if _has_module("uvloop") else "asyncio"
+
+
+def _http_impl() -> str:
+    return "httptools" if _has_module("httptools") else "h11"
+
+
+def run_dev(host: str, port: int) -> None:
+    import uvicorn
+
+    uvicorn.run(APP_PATH, host=host, port=port, reload=True)
+
+
+def _run_gunicorn(host: str, port: int, workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class _Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "app.server.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            # gunicorn의 시간 설정은 정수(초)만 받음
+            self.cfg.set("graceful_timeout", math.ceil(SERVER_GRACEFUL_TIMEOUT))
+            self.cfg.set("keepalive", math.ceil(SERVER_KEEPALIVE))
+            self.cfg.set("backlog", SERVER_BACKLOG)
+            self.cfg.set("timeout", 0)  # 긴 스트리밍 응답을 워커 멈춤으로 오인하지 않도록
+
+        def load(self):
+            from app.main import app
+            return app
+
+    _Application().run()
+
+
+def _run_uvicorn(host: str, port: int, workers: int) -> None:
+    import uvicorn
+
+    # 워커는 별도 프로세스로 앱을 다시 import하므로, 설정/import 오류를 fork 전에 확인
+    import app.main  # noqa: F401
+
+    uvicorn.run(
+        APP_PATH,
+        host=host,
+        port=port,
+        workers=workers,
+        loop=_loop_impl(),
+        http=_http_impl(),
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT,
+        timeout_keep_alive=SERVER_KEEPALIVE,
+        backlog=SERVER_BACKLOG,
+        access_log=False,  # 라우트별 지표는 /metrics로 수집
+    )
+
+
+def run_prod(host: str, port: int, workers: int) -> None:
+    # 모델별 호출 한도/학습 풀 크기를 워커끼리 나누도록 (upstream_scheduler.WORKER_SHARE)
+    os.environ["SERVER_WORKER_COUNT"] = str(workers)
+    logger.info(
+        "starting %d worker(s) on %s:%d (loop=%s, http=%s, preload=%s)",
+        workers, host, port, _loop_impl(), _http_impl(), _can_preload(),
+    )
+    if _can_preload():
+        _run_gunicorn(host, port, workers)
+    else:
+        _run_uvicorn(host, port, workers)
+
+
+if _can_preload():
+    from uvicorn_worker import UvicornWorker as _BaseWorker
+
+    class UvicornWorker(_BaseWorker):
+        """
+        gunicorn 워커: uvloop/httptools(설치 시), lifespan on
+        """
+        CONFIG_KWARGS = {
+            "loop": _loop_impl(),
+            "http": _http_impl(),
+            "lifespan": "on",
+            "timeout_graceful_shutdown": SERVER_GRACEFUL_TIMEOUT,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="talkie-ai server")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="워커 수 (2 이상은 SERVER_STICKY_ROUTING=1 필요)")
+    parser.add_argument("--reload", action="store_true", help="개발 모드 (단일 워커, 코드 변경 시 재시작)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    if args.reload:
+        run_dev(args.host, args.port)
+    else:
+        run_prod(args.host, args.port, worker_count(args.workers))
+
+
+if __name__ == "__main__":
+    main()
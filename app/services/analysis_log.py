@@ -0,0 +1,224 @@
+# ------------------------------------------------------------
+# 피드백 분석 기록 (선택, 추가 전용 바이너리 로그)
+# - 판정 입력 지표(WER, 시간/단어 수, wps)와 당시 이슈를 고정 길이 레코드로 append
+# - 임계치 튜닝 시 threshold_tuning이 열 단위 배열로 한 번에 읽어 재판정
+#   (numpy가 있으면 파일을 구조화 배열로 통째로 읽음: pip install -r requirements-tools.txt, 없으면 array 모듈)
+# - ANALYSIS_LOG_PATH가 비어 있으면 꺼짐
+#
+# 파일 형식: 헤더 16바이트(b"TALKIEAL" + version u32 + record_size u32) + 레코드 반복
+# 레코드(little-endian, 44바이트):
+#   ts f64 | wer_milli i32 | total_ms, speech_ms, pause_ms, longest_pause_ms, n_words i32 |
+#   wps_total_c, wps_art_c i32 (×100) | issue u8 | accuracy_ok u8 | pad 2
+# (wer/wps는 응답과 같은 반올림 값을 정수로 보관 → 다시 나누면 원래 float와 동일.
+#  정확도 판정은 반올림 전 WER로 했으므로, 임계치 근처 재판정용으로 당시 accuracy_ok를 함께 보관)
+# - 파일은 헤더가 쓰인 임시 파일을 link로 만들어, 다른 워커가 헤더 없는 파일에 append하지 않음
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import os
+import random
+import struct
+import time
+from array import array
+from typing import Dict, List
+
+try:
+    import numpy as _np  # 선택 의존성(requirements-tools.txt): 대용량 로그 열 단위 로드
+except ImportError:  # pragma: no cover
+    _np = None
+
+# ===================== 튜닝 가능한 설정 =====================
+
+ANALYSIS_LOG_PATH = os.getenv("ANALYSIS_LOG_PATH", "")                       # 비어 있으면 기록 안 함
+ANALYSIS_LOG_SAMPLE = float(os.getenv("ANALYSIS_LOG_SAMPLE", "1.0"))          # 기록 비율
+ANALYSIS_LOG_BUFFER = int(os.getenv("ANALYSIS_LOG_BUFFER", "256"))            # 모아서 쓸 레코드 수
+ANALYSIS_LOG_FLUSH_SEC = float(os.getenv("ANALYSIS_LOG_FLUSH_SEC", "2.0"))    # flush 주기(s, 다음 기록 때 확인)
+
+# =============================================================
+
+MAGIC = b"TALKIEAL"
+VERSION = 2
+ISSUES = ("accuracy", "speed_fast", "speed_slow", "gaps", "good")
+ISSUE_CODE = {name: i for i, name in enumerate(ISSUES)}
+
+RECORD = struct.Struct("<d8iBB2x")
+HEADER = struct.Struct("<8sII")
+COLUMNS = (
+    "ts", "wer_milli", "total_ms", "speech_ms", "pause_ms", "longest_pause_ms",
+    "n_words", "wps_total_c", "wps_art_c", "issue", "accuracy_ok",
+)
+
+
+def _header() -> bytes:
+    return HEADER.pack(MAGIC, VERSION, RECORD.size)
+
+
+def pack_record(analysis: Dict, ts: float | None = None) -> bytes:
+    """
+    analyze_feedback_with_segments 결과 dict → 레코드 바이트
+    """
+    return RECORD.pack(
+        time.time() if ts is None else ts,
+        round(analysis["wer"] * 1000),
+        analysis["total_ms"],
+        analysis["speech_ms"],
+        analysis["pause_ms"],
+        analysis["longest_pause_ms"],
+        analysis["n_words"],
+        round(analysis["wps_total"] * 100),
+        round(analysis["wps_art"] * 100),
+        ISSUE_CODE[analysis["issue"]],
+        analysis["accuracy_ok"],
+    )
+
+
+class AnalysisLog:
+    """
+    버퍼에 모았다가 레코드 단위로 한 번에 append (여러 워커가 같은 파일을 써도 레코드가 섞이지 않음)
+    """
+
+    def __init__(self, path: str, *, sample: float = 1.0, buffer: int = 256, flush_sec: float = 2.0):
+        self.path = path
+        self.sample = sample
+        self.buffer_size = max(1, buffer)
+        self.flush_sec = flush_sec
+        self._buf: List[bytes] = []
+        self._last_flush = time.monotonic()
+        self._fd: int | None = None
+        self.written = 0
+        self.errors = 0
+
+    def _create(self) -> None:
+        """
+        헤더만 쓴 임시 파일을 만들고 link로 게시 (이미 있으면 그대로 둠)
+        - 파일이 보이는 순간부터 헤더가 있으므로, 동시에 연 다른 워커의 레코드가 헤더보다 앞설 수 없음
+        """
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, _header())
+        finally:
+            os.close(fd)
+        try:
+            os.link(tmp, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp)
+
+    def _open(self) -> int:
+        if self._fd is None:
+            if not os.path.exists(self.path):
+                self._create()
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND)
+            head = os.pread(fd, HEADER.size, 0)
+            if head != _header():
+                os.close(fd)
+                # 형식이 다른 파일에 이어 쓰면 읽을 수 없게 되므로 기록하지 않음 (errors로 집계)
+                raise OSError(f"{self.path}: 헤더가 없거나 형식이 다른 로그 파일입니다.")
+            self._fd = fd
+        return self._fd
+
+    def record(self, analysis: Dict) -> None:
+        if self.sample < 1.0 and random.random() >= self.sample:
+            return
+        try:
+            self._buf.append(pack_record(analysis))
+        except struct.error:
+            # int32 범위를 넘는 값(스키마는 통과한 큰 end 등): 요청 처리를 막지 않도록 버림
+            self.errors += 1
+            return
+        if len(self._buf) >= self.buffer_size or time.monotonic() - self._last_flush >= self.flush_sec:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buf:
+            return
+        data = b"".join(self._buf)
+        n = len(self._buf)
+        self._buf.clear()
+        try:
+            os.write(self._open(), data)
+            self.written += n
+        except OSError:
+            # 기록 실패가 요청 처리를 막지 않도록 버림
+            self.errors += n
+
+    def close(self) -> None:
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "path": self.path,
+            "written": self.written,
+            "buffered": len(self._buf),
+            "errors": self.errors,
+        }
+
+
+analysis_log: AnalysisLog | None = (
+    AnalysisLog(
+        ANALYSIS_LOG_PATH,
+        sample=ANALYSIS_LOG_SAMPLE,
+        buffer=ANALYSIS_LOG_BUFFER,
+        flush_sec=ANALYSIS_LOG_FLUSH_SEC,
+    )
+    if ANALYSIS_LOG_PATH else None
+)
+
+
+def record(analysis: Dict) -> None:
+    if analysis_log is not None:
+        analysis_log.record(analysis)
+
+
+def close() -> None:
+    if analysis_log is not None:
+        analysis_log.close()
+
+
+def log_stats() -> dict:
+    return analysis_log.stats() if analysis_log is not None else {"enabled": False}
+
+
+# -------------------- 읽기 (열 단위) --------------------
+
+def load_columns(path: str) -> Dict[str, object]:
+    """
+    로그 파일 → 열 이름별 배열
+    - numpy가 있으면 구조화 dtype으로 파일을 통째로 읽어 열 뷰 반환 (수백만 건도 한 번의 read)
+    - 없으면 array 모듈로 열 구성
+    - 마지막 레코드가 쓰다 만 상태면 버림
+    """
+    with open(path, "rb") as f:
+        head = f.read(HEADER.size)
+        if len(head) < HEADER.size:
+            raise ValueError(f"{path}: 헤더가 없습니다.")
+        magic, version, size = HEADER.unpack(head)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError(f"{path}: 지원하지 않는 로그 형식입니다 (version={version}, record={size}).")
+        body = f.read()
+    body = body[: len(body) - len(body) % RECORD.size]
+
+    if _np is not None:
+        dtype = _np.dtype([
+            ("ts", "<f8"),
+            *[(name, "<i4") for name in COLUMNS[1:-2]],
+            ("issue", "u1"),
+            ("accuracy_ok", "u1"),
+            ("_pad", "V2"),
+        ])
+        table = _np.frombuffer(body, dtype=dtype)
+        return {name: table[name] for name in COLUMNS}
+
+    columns: Dict[str, array] = {name: array("d" if name == "ts" else "l") for name in COLUMNS}
+    appenders = [columns[name].append for name in COLUMNS]
+    for values in RECORD.iter_unpack(body):
+        for append, v in zip(appenders, values):
+            append(v)
+    return columns
@@ -0,0 +1,102 @@
+# ------------------------------------------------------------
+# 서버 측 대화 세션 저장소
+# - 클라이언트는 session_id + 새 user_input만 보내고, 히스토리는 서버가 보관
+# - 메모리 상한: 세션 수 LRU + 유휴 시간(idle) 만료 + 세션당 메시지 수 제한
+# - 히스토리는 pydantic 모델이 아닌 {"role", "content"} dict 그대로 저장
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List
+
+# ===================== 튜닝 가능한 설정 =====================
+
+SESSION_MAX_SESSIONS = int(os.getenv("CHAT_SESSION_MAX", "10000"))       # 보관할 최대 세션 수
+SESSION_IDLE_TTL_SEC = float(os.getenv("CHAT_SESSION_IDLE_TTL", "1800"))  # 마지막 사용 후 만료(s)
+SESSION_MAX_MESSAGES = int(os.getenv("CHAT_SESSION_MAX_MESSAGES", "100"))  # 세션당 보관 메시지 수
+
+# =============================================================
+
+
+@dataclass
+class ChatSession:
+    session_id: str
+    topic: str
+    history: List[dict] = field(default_factory=list)
+    last_access: float = field(default_factory=time.monotonic)
+
+    def append_turn(self, user_input: str | None, ai_response: str) -> None:
+        """
+        한 턴(사용자 입력 + AI 응답) 추가
+        - user_input이 None(대화 시작)이면 AI 응답만 저장
+        """
+        if user_input is not None:
+            self.history.append({"role": "user", "content": user_input})
+        self.history.append({"role": "assistant", "content": ai_response})
+        overflow = len(self.history) - SESSION_MAX_MESSAGES
+        if overflow > 0:
+            del self.history[:overflow]
+
+
+class SessionStore:
+    """
+    LRU + idle TTL 세션 저장소 (프로세스 내 메모리)
+    """
+
+    def __init__(self, max_sessions: int, idle_ttl_sec: float):
+        self.max_sessions = max_sessions
+        self.idle_ttl_sec = idle_ttl_sec
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def _purge_idle(self, now: float) -> None:
+        # 가장 오래 안 쓴 세션부터 확인 → 만료 안 된 세션을 만나면 중단
+        while self._sessions:
+            sid, session = next(iter(self._sessions.items()))
+            if now - session.last_access <= self.idle_ttl_sec:
+                break
+            del self._sessions[sid]
+            self.expired += 1
+
+    def create(self, topic: str) -> ChatSession:
+        now = time.monotonic()
+        self._purge_idle(now)
+        session = ChatSession(session_id=uuid.uuid4().hex, topic=topic, last_access=now)
+        self._sessions[session.session_id] = session
+        self.created += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        return session
+
+    def get(self, session_id: str) -> ChatSession | None:
+        now = time.monotonic()
+        self._purge_idle(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        session.last_access = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_sec": self.idle_ttl_sec,
+            "created": self.created,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+
+session_store = SessionStore(SESSION_MAX_SESSIONS, SESSION_IDLE_TTL_SEC)
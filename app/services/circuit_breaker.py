@@ -0,0 +1,138 @@
+# ------------------------------------------------------------
+# 업스트림(Clova) 서킷 브레이커 (모델별)
+# - closed   : 최근 호출의 오류율/지연 비율을 추적
+# - open     : 임계치를 넘으면 일정 시간 동안 호출 없이 즉시 실패 → 라우터가 축소 응답
+# - half_open: 대기 시간이 지나면 소수의 탐침 호출만 허용, 성공하면 closed로 복구
+# 오류로 보는 것: 전송 오류/타임아웃, 5xx (429와 4xx는 업스트림 장애로 보지 않음)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Literal, Tuple
+
+from app.services.upstream_scheduler import UpstreamBusyError
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+# ===================== 튜닝 가능한 설정 =====================
+
+BREAKER_ENABLED = os.getenv("CLOVA_BREAKER_ENABLED", "1") == "1"
+BREAKER_WINDOW = int(os.getenv("CLOVA_BREAKER_WINDOW", "50"))                 # 최근 호출 표본 수
+BREAKER_MIN_CALLS = int(os.getenv("CLOVA_BREAKER_MIN_CALLS", "10"))           # 판정에 필요한 최소 표본
+BREAKER_ERROR_RATE = float(os.getenv("CLOVA_BREAKER_ERROR_RATE", "0.5"))      # 오류율 ≥ 50% → open
+BREAKER_SLOW_CALL_SEC = float(os.getenv("CLOVA_BREAKER_SLOW_CALL", "8.0"))    # 이보다 느리면 slow
+BREAKER_SLOW_RATE = float(os.getenv("CLOVA_BREAKER_SLOW_RATE", "0.8"))        # slow 비율 ≥ 80% → open
+BREAKER_OPEN_SEC = float(os.getenv("CLOVA_BREAKER_OPEN_SEC", "15"))           # open 유지 시간(s)
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("CLOVA_BREAKER_PROBES", "2"))        # half-open 탐침 호출 수
+
+# =============================================================
+
+
+class CircuitOpenError(UpstreamBusyError):
+    """
+    브레이커가 열려 있어 업스트림을 호출하지 않고 즉시 실패
+    """
+
+
+class CircuitBreaker:
+    def __init__(self, model: str):
+        self.model = model
+        self.state: BreakerState = "closed"
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=BREAKER_WINDOW)  # (실패, 느림)
+        self._opened_at = 0.0
+        self._half_open_epoch = 0  # half-open 구간 번호 (탐침 표식)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.opened = 0
+        self.short_circuited = 0
+
+    def before_call(self, *, hedge: bool = False) -> int:
+        """
+        호출 허용 여부 확인 (허용 안 되면 CircuitOpenError)
+        - 반환값은 탐침 표식: 0이면 일반 호출, 아니면 half-open 구간 번호.
+          record/release_probe에 그대로 넘겨, 탐침으로 허용된 호출만 탐침 자리를 쓰고 반환함
+        - hedge=True(헤지 추가 호출)는 탐침이 될 수 없음 → closed가 아니면 즉시 실패
+        """
+        if not BREAKER_ENABLED or self.state == "closed":
+            return 0
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < BREAKER_OPEN_SEC:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"{self.model} 업스트림이 불안정해 호출을 중단했습니다.")
+            self.state = "half_open"
+            self._half_open_epoch += 1
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if hedge or self._probes_in_flight >= BREAKER_HALF_OPEN_PROBES:
+            self.short_circuited += 1
+            raise CircuitOpenError(f"{self.model} 업스트림 복구 확인 중입니다.")
+        self._probes_in_flight += 1
+        return self._half_open_epoch
+
+    def record(self, *, failed: bool, latency: float, probe: int = 0) -> None:
+        if not BREAKER_ENABLED:
+            return
+        slow = latency >= BREAKER_SLOW_CALL_SEC
+        if self.state == "half_open":
+            if probe != self._half_open_epoch:
+                return  # 이번 half-open 구간의 탐침이 아닌 호출(closed 때 시작 등)의 결과는 무시
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if failed or slow:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= BREAKER_HALF_OPEN_PROBES:
+                self.state = "closed"
+                self._outcomes.clear()
+            return
+        if self.state == "open":
+            return  # open 이전에 시작된 호출의 결과는 무시
+
+        self._outcomes.append((failed, slow))
+        n = len(self._outcomes)
+        if n < BREAKER_MIN_CALLS:
+            return
+        failures = sum(1 for f, _ in self._outcomes if f)
+        slows = sum(1 for _, s in self._outcomes if s)
+        if failures / n >= BREAKER_ERROR_RATE or slows / n >= BREAKER_SLOW_RATE:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def release_probe(self, probe: int) -> None:
+        """
+        결과를 기록하지 않고 끝난 half-open 탐침(취소 등)의 자리 반환 (probe는 before_call 반환값)
+        """
+        if probe and self.state == "half_open" and probe == self._half_open_epoch:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def stats(self) -> dict:
+        n = len(self._outcomes)
+        return {
+            "state": self.state,
+            "window_calls": n,
+            "error_rate": round(sum(1 for f, _ in self._outcomes if f) / n, 3) if n else 0.0,
+            "slow_rate": round(sum(1 for _, s in self._outcomes if s) / n, 3) if n else 0.0,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(model: str) -> CircuitBreaker:
+    b = _breakers.get(model)
+    if b is None:
+        b = _breakers[model] = CircuitBreaker(model)
+    return b
+
+
+def breaker_stats() -> dict:
+    return {model: b.stats() for model, b in _breakers.items()}
@@ -1,57 +1,388 @@
 import os
+import json
+import time
+import asyncio
+import itertools
+from typing import AsyncIterator
 from dotenv import load_dotenv
 import httpx
+from app.services.response_cache import response_cache, canonical_key, enabled_for as cache_enabled_for
+from app.services.singleflight import single_flight, enabled_for as coalesce_enabled_for
+from app.services.upstream_scheduler import scheduler, UpstreamBusyError, RETRY_MAX
+from app.services.hedging import hedged
+from app.services.circuit_breaker import breaker_for
+from app.services.metrics import UPSTREAM_LATENCY, UPSTREAM_RESPONSES, UPSTREAM_IN_FLIGHT, UPSTREAM_TOKENS
+from app.services.model_router import model_router
+from app.services.tracing import record_span, span
 
 load_dotenv()
 
 CLOVA_API_KEY = os.getenv("CLOVA_API_KEY")
+# 부하 테스트 시 로컬 대역 서버(benchmarks/mock_clova.py)로 바꿀 수 있음
+CLOVA_BASE_URL = os.getenv("CLOVA_BASE_URL", "https://clovastudio.stream.ntruss.com").rstrip("/")
 
-async def call_clova_studio(messages: list[dict]) -> str:
-    headers = {
-        "Authorization": f"Bearer {CLOVA_API_KEY}",
-        "Content-Type": "application/json"
-    }
+# ===================== 커넥션 풀 설정 =====================
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("CLOVA_HTTP_MAX_CONNECTIONS", "100"))      # 동시 커넥션 상한
+HTTP_MAX_KEEPALIVE = int(os.getenv("CLOVA_HTTP_MAX_KEEPALIVE", "20"))           # 유지할 idle 커넥션 수
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("CLOVA_HTTP_KEEPALIVE_EXPIRY", "30"))   # idle 커넥션 유지 시간(s)
+HTTP_CONNECT_TIMEOUT = float(os.getenv("CLOVA_HTTP_CONNECT_TIMEOUT", "3"))      # 연결 수립 타임아웃(s)
+HTTP_POOL_TIMEOUT = float(os.getenv("CLOVA_HTTP_POOL_TIMEOUT", "5"))            # 풀에서 커넥션 대기 타임아웃(s)
+HTTP2_ENABLED = os.getenv("CLOVA_HTTP2", "1") == "1"                            # h2 패키지가 있을 때만 적용
+
+# 엔드포인트별 읽기 타임아웃(s) — 모델이 아니라 엔드포인트 기준 (chat이 DASH로 우회해도 chat 타임아웃)
+STUDIO_READ_TIMEOUT = float(os.getenv("CLOVA_STUDIO_TIMEOUT", "10"))
+CHAT_READ_TIMEOUT = float(os.getenv("CLOVA_CHAT_TIMEOUT", "20"))
+READ_TIMEOUTS = {"chat": CHAT_READ_TIMEOUT}
+
+# 종료 시 진행 중인 업스트림 호출을 기다리는 최대 시간(s)
+SHUTDOWN_DRAIN_SEC = float(os.getenv("CLOVA_SHUTDOWN_DRAIN", "10"))
+
+# =========================================================
+
+_client: httpx.AsyncClient | None = None
+_in_flight = 0
+_total_requests = 0
+
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _endpoint_timeout(read_timeout: float) -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=read_timeout,
+        write=read_timeout,
+        pool=HTTP_POOL_TIMEOUT,
+    )
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=_endpoint_timeout(STUDIO_READ_TIMEOUT),
+        http2=_http2_available(),
+    )
+
+
+async def start_client() -> None:
+    """
+    앱 시작 시 공유 클라이언트 생성 (lifespan에서 호출)
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+
+
+async def prewarm_connections(count: int, timeout: float) -> int:
+    """
+    업스트림 커넥션을 미리 열어 풀에 넣어 둠 (TCP/TLS 핸드셰이크를 첫 요청 전에 끝냄)
+    - 쿼터를 쓰지 않도록 API 경로가 아닌 호스트 루트에 HEAD 요청 (응답 코드는 무관)
+    - HTTP/2면 커넥션 하나를 다중화하므로 1개만 연다
+    - 열린 커넥션 수 반환
+    """
+    client = get_client()
+    count = 1 if _http2_available() else max(0, count)
+
+    async def touch() -> bool:
+        try:
+            await client.head(f"{CLOVA_BASE_URL}/", timeout=timeout)
+            return True
+        except httpx.HTTPError:
+            return False
+
+    results = await asyncio.gather(*(touch() for _ in range(count)))
+    return sum(results)
 
-    payload = {
-        "messages": messages,
-        "topP": 0.8,
-        "topK": 0,
-        "temperature": 0.8,
-        "maxTokens": 100,
-        "repeatPenalty": 1.1,
-        "stopBefore": [],
-        "seed" : 0,
-        "includeTokens": False
+
+async def drain(timeout: float = SHUTDOWN_DRAIN_SEC) -> int:
+    """
+    진행 중인 업스트림 호출이 끝날 때까지 대기 (종료 직전, close_client 전에 호출)
+    - timeout이 지나면 남은 호출 수를 반환 (0이면 모두 끝남)
+    """
+    deadline = time.monotonic() + timeout
+    while _in_flight > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return _in_flight
+
+
+async def close_client() -> None:
+    """
+    앱 종료 시 공유 클라이언트 정리 (lifespan에서 호출)
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    공유 클라이언트 반환
+    - lifespan 밖(스크립트 등)에서 호출되면 지연 생성
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def pool_stats() -> dict:
+    """
+    커넥션 풀 사용 현황 (부하 상황에서 풀 크기 산정용)
+    """
+    stats = {
+        "started": _client is not None and not _client.is_closed,
+        "http2": _http2_available(),
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": HTTP_MAX_KEEPALIVE,
+        "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+        "in_flight": _in_flight,
+        "total_requests": _total_requests,
+        "connections": 0,
+        "idle_connections": 0,
+        "active_connections": 0,
     }
+    # httpx는 풀 상태를 공개하지 않으므로 httpcore 풀을 조회 (없으면 0 유지)
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if c.is_idle())
+    stats["connections"] = len(connections)
+    stats["idle_connections"] = idle
+    stats["active_connections"] = len(connections) - idle
+    return stats
+
+
+def _model_of(url: str) -> str:
+    return url.rsplit("/", 1)[-1]
+
+
+def _record_usage(model: str, result: dict) -> None:
+    """
+    응답의 토큰 사용량을 지표로 기록
+    - v3: result.usage.promptTokens / completionTokens
+    - v1: result.inputLength / outputLength
+    (includeTokens는 토큰별 상세 목록 옵션이라 사용량 집계에는 필요 없음)
+    """
+    usage = result.get("usage") or {}
+    input_tokens = usage.get("promptTokens", result.get("inputLength"))
+    output_tokens = usage.get("completionTokens", result.get("outputLength"))
+    if isinstance(input_tokens, int):
+        UPSTREAM_TOKENS.inc(input_tokens, model=model, kind="input")
+    if isinstance(output_tokens, int):
+        UPSTREAM_TOKENS.inc(output_tokens, model=model, kind="output")
 
-    url = "https://clovastudio.stream.ntruss.com/v3/chat-completions/HCX-DASH-002"
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        return response.json()["result"]["message"]["content"]
-    
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """
+    서킷 브레이커에 실패로 기록할 예외인지 (전송 오류/타임아웃, 5xx)
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
 
-async def call_clova_chat(messages: list[dict]) -> str:
+
+async def _post(url: str, headers: dict, payload: dict, read_timeout: float, *, hedge: bool = False) -> dict:
+    """
+    서킷 브레이커 확인 → 모델별 속도 제한을 거쳐 호출하고, 429는 Retry-After/백오프 후 재시도
+    - hedge: 헤징으로 추가된 호출 (half-open 탐침 자리를 쓰지 않음)
+    """
+    global _in_flight, _total_requests
+    client = get_client()
+    model = _model_of(url)
+    breaker = breaker_for(model)
+    probe = breaker.before_call(hedge=hedge)  # open이면 CircuitOpenError로 즉시 실패
+    recorded = False
+    deadline = scheduler.deadline()
+    attempt = 0
+    try:
+        while True:
+            with span("upstream_queue", model=model):
+                await scheduler.acquire(model, deadline)
+            _in_flight += 1
+            _total_requests += 1
+            UPSTREAM_IN_FLIGHT.inc(model=model)
+            start = time.monotonic()
+            try:
+                try:
+                    with span("clova", model=model, attempt=attempt) as s:
+                        response = await client.post(
+                            url, headers=headers, json=payload, timeout=_endpoint_timeout(read_timeout)
+                        )
+                        s.set("status", response.status_code)
+                except httpx.TransportError as e:
+                    UPSTREAM_RESPONSES.inc(model=model, status="error")
+                    if isinstance(e, httpx.TimeoutException):
+                        model_router.observe(model, time.monotonic() - start)
+                    raise
+                finally:
+                    UPSTREAM_LATENCY.observe(time.monotonic() - start, model=model)
+                UPSTREAM_RESPONSES.inc(model=model, status=str(response.status_code))
+                if response.status_code == 429:
+                    scheduler.on_throttled(model, response, attempt)
+                    if attempt >= RETRY_MAX:
+                        raise UpstreamBusyError(f"{model} 호출 한도를 초과했습니다.")
+                    attempt += 1
+                    continue  # 다음 acquire가 버킷 재개 시각까지 대기 (마감 넘으면 UpstreamBusyError)
+                response.raise_for_status()
+            except Exception as e:
+                if _is_upstream_failure(e):
+                    breaker.record(failed=True, latency=time.monotonic() - start, probe=probe)
+                    recorded = True
+                raise
+            finally:
+                _in_flight -= 1
+                UPSTREAM_IN_FLIGHT.dec(model=model)
+            latency = time.monotonic() - start
+            breaker.record(failed=False, latency=latency, probe=probe)
+            model_router.observe(model, latency)
+            recorded = True
+            data = response.json()
+            _record_usage(model, data.get("result", {}))
+            return data
+    finally:
+        if not recorded:
+            breaker.release_probe(probe)
+
+
+async def _cached_post(
+    url: str, headers: dict, payload: dict, read_timeout: float, endpoint: str | None
+) -> str:
+    """
+    엔드포인트 정책에 따라 캐시 조회 → 동일 호출 병합 → (헤징) 업스트림 호출
+    성공 응답만 캐시에 저장
+    """
+    use_cache = cache_enabled_for(endpoint)
+    use_coalesce = coalesce_enabled_for(endpoint)
+    key = canonical_key(url, payload["messages"]) if (use_cache or use_coalesce) else ""
+    if use_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def fetch() -> str:
+        attempts = itertools.count()  # hedged가 두 번째로 부르는 호출이 헤지
+        data = await hedged(
+            endpoint, lambda: _post(url, headers, payload, read_timeout, hedge=next(attempts) > 0)
+        )
+        content = data["result"]["message"]["content"]
+        if use_cache:
+            response_cache.set(key, content)
+        return content
+
+    if use_coalesce:
+        return await single_flight.do(key, fetch)
+    return await fetch()
+
+
+def _headers(accept: str | None = None) -> dict:
     headers = {
         "Authorization": f"Bearer {CLOVA_API_KEY}",
         "Content-Type": "application/json"
     }
+    if accept:
+        headers["Accept"] = accept
+    return headers
+
+
+async def call_clova(messages: list[dict], *, endpoint: str | None = None) -> str:
+    """
+    엔드포인트의 경로 정책(model_router)으로 모델을 골라 호출 → 응답 본문
+    """
+    profile = model_router.route(endpoint)
+    return await _cached_post(
+        profile.url(CLOVA_BASE_URL),
+        _headers(),
+        profile.payload(messages),
+        READ_TIMEOUTS.get(endpoint or "", STUDIO_READ_TIMEOUT),
+        endpoint,
+    )
 
-    payload = {
-        "messages": messages,
-        "topP": 0.8,
-        "topK": 0,
-        "temperature": 0.8,
-        "maxTokens": 100,
-        "repeatPenalty": 5.0,
-        "stopBefore": [],
-        "includeTokens": False
-    }
 
-    url = "https://clovastudio.stream.ntruss.com/v1/chat-completions/HCX-003"
+async def stream_clova(messages: list[dict], *, endpoint: str = "chat") -> AsyncIterator[str]:
+    """
+    스트리밍 호출 → 토큰 단위로 yield (모델은 model_router가 선택, v1/v3 SSE 형식 동일)
+    - 업스트림 SSE의 token 이벤트만 전달, result 이벤트에서 종료
+    - 소비 측이 중단(aclose/취소)하면 async with 블록이 업스트림 응답을 닫는다
+    """
+    global _in_flight, _total_requests
+    profile = model_router.route(endpoint)
+    headers = _headers("text/event-stream")
+    payload = profile.payload(messages)
+    url = profile.url(CLOVA_BASE_URL)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        return response.json()["result"]["message"]["content"]
+    client = get_client()
+    model = _model_of(url)
+    breaker = breaker_for(model)
+    probe = breaker.before_call()
+    recorded = False
+    try:
+        with span("upstream_queue", model=model):
+            await scheduler.acquire(model, scheduler.deadline())
+    except BaseException:
+        breaker.release_probe(probe)
+        raise
+    _in_flight += 1
+    _total_requests += 1
+    UPSTREAM_IN_FLIGHT.inc(model=model)
+    start = time.monotonic()
+    span_start = time.perf_counter()
+    try:
+        async with client.stream(
+            "POST", url, headers=headers, json=payload,
+            timeout=_endpoint_timeout(READ_TIMEOUTS.get(endpoint, STUDIO_READ_TIMEOUT)),
+        ) as response:
+            UPSTREAM_RESPONSES.inc(model=model, status=str(response.status_code))
+            # 응답 헤더 도착까지 (토큰 스트림은 Server-Timing 헤더 전송 이후라 제외)
+            record_span("clova", span_start, model=model, status=response.status_code, stream=True)
+            if response.status_code == 429:
+                scheduler.on_throttled(model, response, 0)
+                raise UpstreamBusyError(f"{model} 호출 한도를 초과했습니다.")
+            response.raise_for_status()
+            # 브레이커에는 응답 헤더까지의 지연만 기록 (토큰 스트림 길이는 무관)
+            breaker.record(failed=False, latency=time.monotonic() - start, probe=probe)
+            recorded = True
+            event = ""
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                    continue
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if event == "token":
+                    content = json.loads(data).get("message", {}).get("content", "")
+                    if content:
+                        yield content
+                elif event == "result":
+                    _record_usage(model, json.loads(data))
+                    # 라우팅에는 비스트리밍 호출과 같은 기준(응답 완료까지)으로 기록
+                    model_router.observe(model, time.monotonic() - start)
+                    return
+                elif event == "error":
+                    raise RuntimeError(f"Clova stream error: {data}")
+    except Exception as e:
+        if isinstance(e, httpx.TransportError):
+            UPSTREAM_RESPONSES.inc(model=model, status="error")
+        if not recorded and _is_upstream_failure(e):
+            breaker.record(failed=True, latency=time.monotonic() - start, probe=probe)
+            recorded = True
+        raise
+    finally:
+        _in_flight -= 1
+        UPSTREAM_IN_FLIGHT.dec(model=model)
+        UPSTREAM_LATENCY.observe(time.monotonic() - start, model=model)
+        if not recorded:
+            breaker.release_probe(probe)
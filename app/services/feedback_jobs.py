@@ -0,0 +1,377 @@
+# ------------------------------------------------------------
+# 비동기 피드백 작업 (제출 → 폴링/콜백)
+# - 제출 시 로컬 분석까지만 하고 job_id를 바로 반환, 피드백 문장(LLM)은 워커가 생성
+# - 워커 풀이 제한된 대기열에서 꺼내 처리 (가득 차면 제출을 503으로 거절)
+# - 결과는 완료 후 FEEDBACK_JOBS_TTL 동안 보관 → GET 폴링(wait로 롱폴링) 또는 callback_url로 POST
+# - Idempotency-Key가 같은 재제출은 기존 작업을 돌려줌 (연결이 끊겨 다시 보내도 업스트림 호출은 한 번)
+#   키는 본문 해시와 묶여 있어, 같은 키에 다른 본문이면 거절 (다른 요청의 결과를 돌려주지 않음)
+# - callback_url은 FEEDBACK_CALLBACK_ALLOWED_HOSTS에 있는 호스트만 허용 (비어 있으면 콜백 사용 불가)
+# - 업스트림 실패 시 분석 결과 + 템플릿 문장으로 완료 (source=fallback)
+# - 주의: 작업 저장소는 워커 프로세스별 메모리 (멀티 워커면 앞단 sticky 라우팅 필요)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Literal, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services.feedback_templates import FEEDBACK_MODE, produce_feedback_text, template_feedback
+from app.services.tracing import stage
+from app.services.upstream_scheduler import UpstreamBusyError
+
+JobStatus = Literal["queued", "running", "done"]
+CallbackStatus = Literal["pending", "delivered", "failed"]
+
+# ===================== 튜닝 가능한 설정 =====================
+
+JOBS_WORKERS = int(os.getenv("FEEDBACK_JOBS_WORKERS", "4"))                 # 동시에 처리할 작업 수
+JOBS_QUEUE_MAX = int(os.getenv("FEEDBACK_JOBS_QUEUE_MAX", "200"))            # 대기열 최대 길이
+JOBS_TTL_SEC = float(os.getenv("FEEDBACK_JOBS_TTL", "600"))                  # 완료 후 결과 보관 시간(s)
+JOBS_MAX_STORED = int(os.getenv("FEEDBACK_JOBS_MAX_STORED", "10000"))        # 보관할 완료 작업 최대 수
+JOBS_WAIT_MAX_SEC = float(os.getenv("FEEDBACK_JOBS_WAIT_MAX", "20"))         # 롱폴링 최대 대기(s)
+JOBS_DRAIN_SEC = float(os.getenv("FEEDBACK_JOBS_DRAIN", "10"))               # 종료 시 남은 작업 대기(s)
+# 응답을 기다리는 클라이언트가 없으므로 hybrid 마감 없이 LLM 응답을 기다림 (template 모드는 그대로)
+JOBS_MODE = os.getenv("FEEDBACK_JOBS_MODE", "template" if FEEDBACK_MODE == "template" else "llm")
+
+CALLBACK_TIMEOUT_SEC = float(os.getenv("FEEDBACK_CALLBACK_TIMEOUT", "5"))
+CALLBACK_RETRIES = int(os.getenv("FEEDBACK_CALLBACK_RETRIES", "2"))          # 실패 시 재시도 횟수
+CALLBACK_BACKOFF_SEC = float(os.getenv("FEEDBACK_CALLBACK_BACKOFF", "1.0"))  # 재시도 간격 기본값(s, 2배씩)
+CALLBACK_SECRET = os.getenv("FEEDBACK_CALLBACK_SECRET", "")                  # 있으면 본문 HMAC-SHA256 서명
+# 허용할 콜백 호스트 (쉼표 구분, 비어 있으면 콜백 사용 불가 — 임의 내부 주소로의 요청 방지)
+CALLBACK_ALLOWED_HOSTS = {
+    h.strip().lower() for h in os.getenv("FEEDBACK_CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()
+}
+
+# =============================================================
+
+
+class JobQueueFullError(UpstreamBusyError):
+    """
+    작업 대기열이 가득 찼거나 종료 중이라 제출을 받지 않음 (라우터에서 503)
+    """
+
+
+class IdempotencyKeyMismatchError(Exception):
+    """
+    같은 Idempotency-Key로 다른 본문을 제출 (라우터에서 422)
+    """
+
+
+@dataclass
+class FeedbackJob:
+    job_id: str
+    analysis: dict
+    messages: List[dict]
+    callback_url: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    body_hash: str = ""
+    status: JobStatus = "queued"
+    feedback_text: Optional[str] = None
+    source: Optional[str] = None
+    callback_status: Optional[CallbackStatus] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def view(self) -> dict:
+        """
+        폴링 응답/콜백 본문 (FeedbackJobStatus 형태)
+        """
+        result = None
+        if self.status == "done":
+            result = {"feedback_text": self.feedback_text, "analysis": self.analysis, "source": self.source}
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "analysis": self.analysis,
+            "result": result,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "callback": self.callback_status,
+        }
+
+
+def body_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def validate_callback_url(url: str) -> str:
+    """
+    http(s) 절대 URL이고 허용 목록의 호스트면 그대로 반환, 아니면 ValueError
+    (허용 목록이 비어 있으면 모든 콜백 거절)
+    """
+    if not CALLBACK_ALLOWED_HOSTS:
+        raise ValueError("콜백이 설정되지 않은 서버입니다. 폴링(GET /jobs/{job_id})을 사용하세요.")
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url은 http(s) 절대 URL이어야 합니다.")
+    if parts.hostname.lower() not in CALLBACK_ALLOWED_HOSTS:
+        raise ValueError(f"허용되지 않은 콜백 호스트입니다: {parts.hostname}")
+    return url
+
+
+class FeedbackJobQueue:
+    def __init__(self, workers: int, queue_max: int, ttl_sec: float, max_stored: int):
+        self.workers = max(1, workers)
+        self.ttl_sec = ttl_sec
+        self.max_stored = max_stored
+        self._queue: asyncio.Queue[FeedbackJob] = asyncio.Queue(maxsize=max(1, queue_max))
+        self._jobs: Dict[str, FeedbackJob] = {}
+        self._by_key: Dict[str, str] = {}
+        self._finished: Deque[Tuple[float, str]] = deque()  # (만료 시각, job_id) — 완료 순서 = 만료 순서
+        self._tasks: List[asyncio.Task] = []
+        self._callbacks: Set[asyncio.Task] = set()
+        self._client: httpx.AsyncClient | None = None
+        self._accepting = False
+        self.running = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.key_mismatches = 0
+        self.rejected = 0
+        self.completed = 0
+        self.fallbacks = 0
+        self.expired = 0
+        self.callbacks_delivered = 0
+        self.callbacks_failed = 0
+
+    # -------------------- 저장소 --------------------
+
+    def _forget(self, job_id: str) -> None:
+        job = self._jobs.pop(job_id, None)
+        if job is not None and job.idempotency_key:
+            self._by_key.pop(job.idempotency_key, None)
+
+    def _purge(self, now: float) -> None:
+        # 완료 순서대로 만료 확인 → 만료 안 된 작업을 만나면 중단 (보관 수 상한을 넘으면 오래된 것부터 제거)
+        while self._finished and (self._finished[0][0] <= now or len(self._finished) > self.max_stored):
+            _expires, job_id = self._finished.popleft()
+            self._forget(job_id)
+            self.expired += 1
+
+    def get(self, job_id: str) -> FeedbackJob | None:
+        self._purge(time.monotonic())
+        return self._jobs.get(job_id)
+
+    def find(self, idempotency_key: str | None, body_hash: str) -> FeedbackJob | None:
+        """
+        같은 Idempotency-Key + 같은 본문으로 제출된 (아직 보관 중인) 작업
+        - 키는 같은데 본문이 다르면 IdempotencyKeyMismatchError
+        """
+        if not idempotency_key:
+            return None
+        self._purge(time.monotonic())
+        job = self._jobs.get(self._by_key.get(idempotency_key, ""))
+        if job is None:
+            return None
+        if not hmac.compare_digest(job.body_hash, body_hash):
+            self.key_mismatches += 1
+            raise IdempotencyKeyMismatchError("같은 Idempotency-Key로 다른 요청이 이미 제출되었습니다.")
+        self.deduplicated += 1
+        return job
+
+    def admit(self, callback_url: str | None = None) -> None:
+        """
+        제출을 거절할 조건 확인 (콜백 허용 목록, 접수 상태, 대기열 여유)
+        - 라우터가 로컬 분석 전에 호출 → 거절될 요청은 분석하지 않음 (submit도 같은 확인을 거침)
+        """
+        if callback_url is not None:
+            validate_callback_url(callback_url)
+        if not self._accepting:
+            self.rejected += 1
+            raise JobQueueFullError("피드백 작업을 받을 수 없는 상태입니다.")
+        if self._queue.full():
+            self.rejected += 1
+            raise JobQueueFullError("피드백 작업 대기열이 가득 찼습니다.")
+
+    def submit(
+        self,
+        analysis: dict,
+        messages: List[dict],
+        *,
+        body_hash: str,
+        callback_url: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> FeedbackJob:
+        """
+        분석이 끝난 요청을 대기열에 넣고 작업 반환 (같은 키·본문의 작업이 있으면 그 작업)
+        - body_hash: 요청 원문 본문의 해시 (body_digest)
+        """
+        existing = self.find(idempotency_key, body_hash)
+        if existing is not None:
+            return existing
+        self.admit(callback_url)
+        job = FeedbackJob(
+            job_id=uuid.uuid4().hex,
+            analysis=analysis,
+            messages=messages,
+            callback_url=callback_url,
+            idempotency_key=idempotency_key or None,
+            body_hash=body_hash,
+            callback_status="pending" if callback_url else None,
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFullError("피드백 작업 대기열이 가득 찼습니다.")
+        self._jobs[job.job_id] = job
+        if job.idempotency_key:
+            self._by_key[job.idempotency_key] = job.job_id
+        self.submitted += 1
+        return job
+
+    async def wait(self, job: FeedbackJob, timeout: float) -> FeedbackJob:
+        """
+        완료될 때까지 최대 timeout(s) 대기 (롱폴링)
+        """
+        timeout = min(max(0.0, timeout), JOBS_WAIT_MAX_SEC)
+        if timeout > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    # -------------------- 워커 --------------------
+
+    async def _process(self, job: FeedbackJob) -> None:
+        job.status = "running"
+        self.running += 1
+        issue, wpm_user = job.analysis["issue"], job.analysis["wpm_user"]
+        try:
+            with stage("feedback_job_text"):
+                text, source = await produce_feedback_text(
+                    job.messages, issue=issue, wpm_user=wpm_user, mode=JOBS_MODE,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 분석은 끝났으므로 템플릿 문장으로 완료
+            text, source = template_feedback(issue, wpm_user), "fallback"
+            self.fallbacks += 1
+        finally:
+            self.running -= 1
+
+        job.feedback_text, job.source = text, source
+        job.status = "done"
+        job.finished_at = time.time()
+        job.messages = []  # 보관 중에는 필요 없음
+        job.done.set()
+        self.completed += 1
+        self._finished.append((time.monotonic() + self.ttl_sec, job.job_id))
+        self._purge(time.monotonic())
+
+        if job.callback_url:
+            task = asyncio.create_task(self._deliver(job))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: FeedbackJob) -> None:
+        """
+        완료된 작업을 callback_url로 POST (2xx가 아니면 백오프 후 재시도)
+        """
+        body = json.dumps(job.view(), ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Talkie-Job-Id": job.job_id}
+        if CALLBACK_SECRET:
+            digest = hmac.new(CALLBACK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Talkie-Signature"] = f"sha256={digest}"
+        for attempt in range(CALLBACK_RETRIES + 1):
+            try:
+                response = await self._client.post(job.callback_url, content=body, headers=headers)
+                if response.is_success:
+                    job.callback_status = "delivered"
+                    self.callbacks_delivered += 1
+                    return
+            except httpx.HTTPError:
+                pass
+            if attempt < CALLBACK_RETRIES:
+                await asyncio.sleep(CALLBACK_BACKOFF_SEC * (2 ** attempt))
+        job.callback_status = "failed"
+        self.callbacks_failed += 1
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._accepting = True
+        # 리다이렉트를 따라가지 않음 (허용 호스트가 다른 주소로 돌려보내는 경우 차단)
+        self._client = httpx.AsyncClient(timeout=CALLBACK_TIMEOUT_SEC, follow_redirects=False)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = JOBS_DRAIN_SEC) -> None:
+        """
+        새 제출을 막고, 남은 작업/콜백을 timeout까지 기다린 뒤 워커 종료
+        """
+        self._accepting = False
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self._callbacks:
+            await asyncio.wait(set(self._callbacks), timeout=max(0.1, timeout))
+        for task in [*self._tasks, *self._callbacks]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._callbacks, return_exceptions=True)
+        self._tasks.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "mode": JOBS_MODE,
+            "queued": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "running": self.running,
+            "stored": len(self._jobs),
+            "ttl_sec": self.ttl_sec,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "key_mismatches": self.key_mismatches,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "fallbacks": self.fallbacks,
+            "expired": self.expired,
+            "callbacks_delivered": self.callbacks_delivered,
+            "callbacks_failed": self.callbacks_failed,
+        }
+
+
+job_queue = FeedbackJobQueue(JOBS_WORKERS, JOBS_QUEUE_MAX, JOBS_TTL_SEC, JOBS_MAX_STORED)
+
+
+async def start_jobs() -> None:
+    """
+    작업 워커 시작 (lifespan에서 호출)
+    """
+    await job_queue.start()
+
+
+async def stop_jobs() -> None:
+    """
+    작업 워커 종료 (lifespan에서 호출, 업스트림 drain 전)
+    """
+    await job_queue.stop()
+
+
+def jobs_stats() -> dict:
+    return job_queue.stats()
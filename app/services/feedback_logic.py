@@ -10,10 +10,21 @@
 # ------------------------------------------------------------
 
 from __future__ import annotations
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Dict, List, Literal
+from itertools import islice
+from operator import itemgetter, le, sub
+from typing import Dict, List, Literal, Optional, Sequence, Tuple, Union
 import re
 
+from app.services.tracing import span
+
+try:
+    import numpy as _np  # 선택 의존성(requirements-tools.txt): wer_many 벡터화 경로
+except ImportError:  # pragma: no cover
+    _np = None
+
 Issue = Literal["accuracy", "speed_fast", "speed_slow", "gaps", "good"]
 
 # ===================== 튜닝 가능한 임계치 =====================
@@ -54,30 +65,134 @@ def _normalize(text: str) -> str:
     t = _SPACES.sub(" ", t)
     return t.strip()
 
+def _token_ids(*token_lists: List[str]) -> List[List[int]]:
+    """
+    토큰 문자열 → 정수 ID (같은 호출 안에서 공유하는 어휘)
+    - DP 내부 비교를 문자열 대신 정수 비교로
+    """
+    vocab: Dict[str, int] = {}
+    return [[vocab.setdefault(t, len(vocab)) for t in toks] for toks in token_lists]
+
+def _edit_distance_bounded(r: List[int], h: List[int], k: int) -> int:
+    """
+    편집거리(삽입/삭제/치환) ≤ k 인 경우에만 정확한 값을 구하고, 넘으면 k+1 반환
+    - 두 줄(O(H)) 메모리
+    - |i-j| ≤ k 대각 띠만 계산 (Ukkonen)
+    - 한 줄 전체가 k를 넘으면 조기 종료
+    """
+    R, H = len(r), len(h)
+    if abs(R - H) > k:
+        return k + 1
+    over = k + 1
+    prev = [j if j <= k else over for j in range(H + 1)]
+    for i in range(1, R + 1):
+        lo = max(1, i - k)
+        hi = min(H, i + k)
+        cur = [over] * (H + 1)
+        if i <= k:
+            cur[0] = i
+        ri = r[i - 1]
+        row_min = cur[0]
+        left = cur[lo - 1]
+        for j in range(lo, hi + 1):
+            v = prev[j - 1] + (ri != h[j - 1])     # 치환
+            if prev[j] + 1 < v: v = prev[j] + 1    # 삭제
+            if left + 1 < v: v = left + 1          # 삽입
+            if v > over: v = over
+            cur[j] = v
+            left = v
+            if v < row_min: row_min = v
+        if row_min > k:
+            return over
+        prev = cur
+    return prev[H]
+
+def _edit_distance(r: List[int], h: List[int]) -> int:
+    """
+    정확한 편집거리
+    - 띠 폭을 두 배씩 늘려가며 bounded 계산 (거리 d에 대해 O(d·n))
+    """
+    k = max(1, abs(len(r) - len(h)))
+    bound = max(len(r), len(h))
+    while True:
+        d = _edit_distance_bounded(r, h, k)
+        if d <= k or k >= bound:
+            return min(d, bound)
+        k *= 2
+
 def _wer(ref: str, hyp: str) -> float:
     """
     WER(Word Error Rate) 계산
     - 공백 기준 토큰화
     - 편집거리(삽입/삭제/치환)
     """
-    r = _normalize(ref).split()
-    h = _normalize(hyp).split()
+    r, h = _token_ids(_normalize(ref).split(), _normalize(hyp).split())
     if not r and not h:
         return 0.0
-    # DP 테이블
-    R, H = len(r), len(h)
-    d = [[0]*(H+1) for _ in range(R+1)]
-    for i in range(R+1): d[i][0] = i
-    for j in range(H+1): d[0][j] = j
-    for i in range(1, R+1):
-        for j in range(1, H+1):
-            cost = 0 if r[i-1] == h[j-1] else 1
-            d[i][j] = min(
-                d[i-1][j] + 1,      # 삭제
-                d[i][j-1] + 1,      # 삽입
-                d[i-1][j-1] + cost  # 치환
-            )
-    return d[R][H] / max(1, R)
+    return _edit_distance(r, h) / max(1, len(r))
+
+def wer_within(ref: str, hyp: str, threshold: float = WER_THRESHOLD) -> bool:
+    """
+    WER ≤ threshold 여부만 판정 (허용 오류 수를 넘는 순간 계산 중단)
+    """
+    r, h = _token_ids(_normalize(ref).split(), _normalize(hyp).split())
+    if not r and not h:
+        return True
+    budget = int(threshold * max(1, len(r)) + 1e-9)
+    return _edit_distance_bounded(r, h, budget) / max(1, len(r)) <= threshold
+
+def wer_many(pairs: List[Tuple[str, str]]) -> List[float]:
+    """
+    (ref, hyp) 여러 쌍의 WER을 한 번에 계산. 결과는 _wer와 동일
+    - numpy가 있으면 쌍 방향으로 벡터화한 DP (행 단위 루프만 Python)
+    - 없으면 _wer 반복
+    numpy는 requirements-tools.txt의 선택 의존성 (일괄 채점/튜닝 같은 오프라인 작업용).
+    서비스 이미지(requirements.txt)에는 없으므로 요청 경로에서는 벡터화 경로가 쓰이지 않음
+    """
+    if _np is None or not pairs:
+        return [_wer(ref, hyp) for ref, hyp in pairs]
+    return _wer_many_numpy(pairs)
+
+def _wer_many_numpy(pairs: List[Tuple[str, str]]) -> List[float]:
+    np = _np
+    toks = []
+    for ref, hyp in pairs:
+        toks.append(_normalize(ref).split())
+        toks.append(_normalize(hyp).split())
+    ids = _token_ids(*toks)
+    refs, hyps = ids[0::2], ids[1::2]
+    N = len(pairs)
+    r_len = np.array([len(r) for r in refs], dtype=np.int64)
+    h_len = np.array([len(h) for h in hyps], dtype=np.int64)
+    R, H = int(r_len.max()), int(h_len.max())
+
+    # 패딩 값은 서로 다르게 (-1/-2) → 패딩 구간은 결과에 영향 없음(d[R_n][H_n]만 읽음)
+    ref_m = np.full((N, max(R, 1)), -1, dtype=np.int64)
+    hyp_m = np.full((N, max(H, 1)), -2, dtype=np.int64)
+    for n in range(N):
+        ref_m[n, :r_len[n]] = refs[n]
+        hyp_m[n, :h_len[n]] = hyps[n]
+
+    rows = np.arange(N)
+    cols = np.arange(H + 1, dtype=np.int64)
+    prev = np.broadcast_to(cols, (N, H + 1)).copy()
+    dist = np.zeros(N, dtype=np.int64)
+    done = r_len == 0
+    dist[done] = h_len[done]
+    for i in range(1, R + 1):
+        cost = (hyp_m[:, :H] != ref_m[:, i - 1:i]).astype(np.int64)
+        # 삭제/치환 후보 a_j, 삽입은 cur[j] = min_k≤j (a_k + j - k) = j + cummin(a_k - k)
+        a = np.empty_like(prev)
+        a[:, 0] = i
+        a[:, 1:] = np.minimum(prev[:, 1:] + 1, prev[:, :-1] + cost)
+        cur = np.minimum.accumulate(a - cols, axis=1) + cols
+        hit = r_len == i
+        dist[hit] = cur[rows[hit], h_len[hit]]
+        prev = cur
+    return [
+        0.0 if r_len[n] == 0 and h_len[n] == 0 else float(dist[n]) / max(1, int(r_len[n]))
+        for n in range(N)
+    ]
 
 # -------------------- 세그먼트 메트릭 --------------------
 
@@ -91,6 +206,19 @@ class SegMetrics:
     wps_total: float       # 초당 단어수 (총시간 기준)
     wps_art: float         # 초당 단어수 (순수 발화시간 기준: 아티큘레이션 속도)
 
+def _coerce_word(w) -> Optional[Tuple[int, int, str]]:
+    """
+    단어 한 항목 → (start_ms, end_ms, token). 형식이 맞지 않으면 None
+    """
+    if isinstance(w, dict):
+        ws = int(w.get("start", 0))
+        we = int(w.get("end", ws))
+        return (ws, we, str(w.get("token", "")))
+    if isinstance(w, (list, tuple)) and len(w) >= 2:
+        ws, we = int(w[0]), int(w[1])
+        return (ws, we, str(w[2]) if len(w) >= 3 else "")
+    return None
+
 def _merge_segments(segments: List[dict]) -> dict:
     """
     여러 세그먼트가 오면 하나로 병합.
@@ -105,39 +233,206 @@ def _merge_segments(segments: List[dict]) -> dict:
     words = []
     for s in segments:
         for w in s.get("words", []):
-            if isinstance(w, dict):
-                ws = int(w.get("start", 0))
-                we = int(w.get("end", ws))
-                tok = str(w.get("token", ""))
-                words.append((ws, we, tok))
-            elif isinstance(w, (list, tuple)) and len(w) >= 2:
-                ws, we = int(w[0]), int(w[1])
-                tok = str(w[2]) if len(w) >= 3 else ""
-                words.append((ws, we, tok))
+            t = _coerce_word(w)
+            if t is not None:
+                words.append(t)
     words.sort(key=lambda x: x[0])
     return {"start": s_min, "end": e_max, "words": words}
 
-def _metrics_from_segments(segments: List[dict]) -> SegMetrics:
+_INT_STR_RE = re.compile(r"[+-]?[0-9]+(?:_[0-9]+)*(?:\.0+)?")
+
+def _schema_int(v, where: str) -> int:
     """
-    segments → 메트릭 추출 (ms 단위)
+    pydantic int 필드(lax)와 같은 규칙의 정수 변환
+    - bool/int 그대로, 소수부가 없는 실수(1.0), 십진 정수 문자열("10", " +10 ", "1_000", "10.0") 허용
+    - 1.5, "1.5", "1e3", "10.", nan/inf, 그 밖의 타입은 ValueError
     """
-    merged = _merge_segments(segments)
-    start = int(merged.get("start", 0))
-    end = int(merged.get("end", start))
-    total_ms = max(0, end - start)
+    if isinstance(v, int):
+        return int(v)
+    if isinstance(v, str):
+        text = v.strip()
+        if _INT_STR_RE.fullmatch(text):
+            return int(text.partition(".")[0])
+    elif isinstance(v, float) and v.is_integer():
+        return int(v)
+    raise ValueError(f"{where}는 정수여야 합니다.")
+
+class WordTable:
+    """
+    병합된 단어 타임스탬프를 배열로 보관 (단어마다 객체를 만들지 않음)
+    - starts/ends: int64 array, tokens: list
+    - start/end: 세그먼트 경계(최소 start, 최대 end)
+    - ordered: starts가 이미 오름차순이면 True (정렬 생략)
+    """
+    __slots__ = ("start", "end", "starts", "ends", "tokens", "ordered")
+
+    def __init__(self):
+        self.start = 0
+        self.end = 0
+        self.starts = array("q")
+        self.ends = array("q")
+        self.tokens: List[str] = []
+        self.ordered = True
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_segments(cls, segments: List[dict], *, strict: bool = False) -> "WordTable":
+        """
+        세그먼트 목록(원본 JSON 또는 model_dump 결과)을 한 번만 훑어 테이블 구성
+        - words 항목은 [start, end, "token"] 또는 {"start", "end", "token"}
+        - 빠른 경로: 세그먼트별로 값을 그대로 모아 int64 배열에 한 번에 담음 (배열 생성이 정수 검사를 겸함)
+          정수가 아닌 값(실수/문자열 등)이 섞여 있으면 전체를 단어별 변환 경로로 다시 구성
+        - strict=True: 요청 본문 검증용. FeedbackRequest 스키마와 같은 규칙으로 ValueError
+            segments/words는 배열, segment와 dict 단어의 start/end는 정수(1.0, "10" 허용, 1.5 거부),
+            [s, e, tok] 단어는 스키마 validator처럼 int() 변환, 첫 항목과 다른 형식이 섞이면 거부
+          (strict=False는 _merge_segments와 같은 기본값/무시 규칙)
+        """
+        if strict and not isinstance(segments, list):
+            raise ValueError("segments는 배열이어야 합니다.")
+        if not segments:
+            return cls()
+        try:
+            return cls._build(segments, strict, fast=True)
+        except (TypeError, OverflowError):
+            table = cls._build(segments, strict, fast=False)
+        return table
+
+    @classmethod
+    def _build(cls, segments, strict: bool, fast: bool) -> "WordTable":
+        table = cls()
+        starts: List = []
+        ends: List = []
+        tokens = table.tokens
+        s_min = e_max = None
+        for i, seg in enumerate(segments):
+            if strict:
+                if not isinstance(seg, dict) or "start" not in seg or "end" not in seg:
+                    raise ValueError(f"segments[{i}]에 start/end가 필요합니다.")
+                ss = _schema_int(seg["start"], f"segments[{i}].start")
+                se = _schema_int(seg["end"], f"segments[{i}].end")
+            else:
+                ss = int(seg.get("start", 0))
+                se = int(seg["end"]) if "end" in seg else None
+            s_min = ss if s_min is None else min(s_min, ss)
+            if se is not None:
+                e_max = se if e_max is None else max(e_max, se)
+            words = seg.get("words")
+            if not isinstance(words, (list, tuple)):
+                if strict and words is not None:
+                    raise ValueError(f"segments[{i}].words는 배열이어야 합니다.")
+                continue  # 기준 동작: 문자열/객체 words는 단어 없음으로 처리
+            if not words:
+                continue
+            if not fast:
+                s_part, e_part, t_part = cls._parse_words(words, strict, i)
+            else:
+                try:
+                    if isinstance(words[0], dict):
+                        if strict:
+                            # token 타입 등 스키마 검사가 필요하므로 단어별 경로
+                            raise TypeError
+                        s_part = [w["start"] for w in words]
+                        e_part = [w["end"] for w in words]
+                        t_part = [str(w.get("token", "")) for w in words]
+                    else:
+                        s_part = [w[0] for w in words]
+                        e_part = [w[1] for w in words]
+                        t_part = [str(w[2]) if len(w) >= 3 else "" for w in words]
+                except (IndexError, KeyError, TypeError, AttributeError):
+                    s_part, e_part, t_part = cls._parse_words(words, strict, i)
+            starts += s_part
+            ends += e_part
+            tokens += t_part
+        table.start = s_min
+        table.end = max(e_max, s_min) if e_max is not None else s_min
+        if fast:
+            # 정수가 아닌 값이 있으면 TypeError, int64 범위 밖이면 OverflowError → 단어별 경로
+            table.starts = array("q", starts)
+            table.ends = array("q", ends)
+        else:
+            try:
+                table.starts = array("q", starts)
+                table.ends = array("q", ends)
+            except OverflowError:
+                raise ValueError("시각 값이 허용 범위를 벗어났습니다.")
+        table.ordered = all(map(le, starts, islice(starts, 1, None)))
+        return table
+
+    @staticmethod
+    def _parse_words(words, strict: bool, seg_index: int) -> Tuple[List[int], List[int], List[str]]:
+        """
+        형식이 섞였거나 필드가 빠졌거나 정수가 아닌 값이 있는 words를 단어별로 처리 (느린 경로)
+        """
+        s_part: List[int] = []
+        e_part: List[int] = []
+        t_part: List[str] = []
+        where = f"segments[{seg_index}].words"
+        list_form = isinstance(words[0], list)
+        for j, w in enumerate(words):
+            if isinstance(w, (list, tuple)):
+                if strict and not list_form:
+                    raise ValueError(f"{where}[{j}] 형식이 첫 항목과 다릅니다.")
+                if len(w) < 2:
+                    continue
+                try:
+                    ws, we = int(w[0]), int(w[1])
+                except (TypeError, ValueError):
+                    if strict:
+                        raise ValueError(f"{where}[{j}]의 start/end는 정수여야 합니다.")
+                    raise
+                tok = str(w[2]) if len(w) >= 3 else ""
+            elif isinstance(w, dict):
+                if strict:
+                    if list_form:
+                        raise ValueError(f"{where}[{j}] 형식이 첫 항목과 다릅니다.")
+                    if "start" not in w or "end" not in w:
+                        raise ValueError(f"{where} 항목에 start/end가 필요합니다.")
+                    ws = _schema_int(w["start"], f"{where}[{j}].start")
+                    we = _schema_int(w["end"], f"{where}[{j}].end")
+                    tok = w.get("token", "")
+                    if not isinstance(tok, str):
+                        raise ValueError(f"{where}[{j}].token은 문자열이어야 합니다.")
+                else:
+                    ws = int(w.get("start", 0))
+                    we = int(w.get("end", ws))
+                    tok = str(w.get("token", ""))
+            elif strict:
+                raise ValueError(f"{where} 항목 형식이 잘못되었습니다.")
+            else:
+                continue
+            s_part.append(ws)
+            e_part.append(we)
+            t_part.append(tok)
+        return s_part, e_part, t_part
+
+    def sorted_spans(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        시작시간 기준으로 정렬된 (starts, ends). 이미 정렬돼 있으면 그대로 반환
+        """
+        if self.ordered:
+            return self.starts, self.ends
+        pairs = sorted(zip(self.starts, self.ends), key=itemgetter(0))  # 안정 정렬
+        return [p[0] for p in pairs], [p[1] for p in pairs]
+
+def _metrics_from_segments(segments: Union[List[dict], WordTable]) -> SegMetrics:
+    """
+    segments(또는 이미 만든 WordTable) → 메트릭 추출 (ms 단위)
+    """
+    table = segments if isinstance(segments, WordTable) else WordTable.from_segments(segments)
+    total_ms = max(0, table.end - table.start)
 
-    words = merged.get("words", [])
-    durations = [max(0, we - ws) for (ws, we, _tok) in words]
-    n_words = len(durations)
-    speech_ms = sum(durations)
+    starts, ends = table.sorted_spans()
+    n_words = len(starts)
+    speech_ms = sum(d for d in map(sub, ends, starts) if d > 0)
 
-    gaps = []
-    for i in range(len(words) - 1):
-        prev_end = words[i][1]
-        next_start = words[i+1][0]
-        gaps.append(max(0, next_start - prev_end))
-    pause_ms = sum(gaps)
-    longest_pause_ms = max(gaps) if gaps else 0
+    if n_words > 1:
+        gaps = [g for g in map(sub, islice(starts, 1, None), ends) if g > 0]
+        pause_ms = sum(gaps)
+        longest_pause_ms = max(gaps, default=0)
+    else:
+        pause_ms = longest_pause_ms = 0
 
     total_sec = max(total_ms / 1000.0, 1e-3)
     speech_sec = max(speech_ms / 1000.0, 1e-3)
@@ -155,6 +450,118 @@ def _metrics_from_segments(segments: List[dict]) -> SegMetrics:
         wps_art=wps_art,
     )
 
+# -------------------- 온라인 누적(스트리밍 STT) --------------------
+
+class SegmentAccumulator:
+    """
+    세그먼트/단어가 도착할 때마다 SegMetrics 필드를 누적 (전체 재계산 없음)
+    - 단어는 시작시간 순으로 유지 (순서대로 오면 O(1), 늦게 온 단어는 제자리 삽입)
+    - 결과는 같은 세그먼트를 한 번에 _metrics_from_segments에 넘긴 것과 동일
+    - 세그먼트 없이 단어만 오면 단어 구간으로 전체 경계를 넓힘
+    """
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._words: List[Tuple[int, int, str]] = []
+        self._start: Optional[int] = None   # 세그먼트 start 최솟값
+        self._end: Optional[int] = None     # 세그먼트 end 최댓값
+        self._gap_counts: Dict[int, int] = {}
+        self.speech_ms = 0
+        self.pause_ms = 0
+        self.longest_pause_ms = 0
+
+    @property
+    def n_words(self) -> int:
+        return len(self._words)
+
+    def _extend(self, start: int, end: Optional[int]) -> None:
+        self._start = start if self._start is None else min(self._start, start)
+        if end is not None:
+            self._end = end if self._end is None else max(self._end, end)
+
+    def _add_gap(self, gap: int) -> None:
+        self.pause_ms += gap
+        self._gap_counts[gap] = self._gap_counts.get(gap, 0) + 1
+        if gap > self.longest_pause_ms:
+            self.longest_pause_ms = gap
+
+    def _drop_gap(self, gap: int) -> None:
+        self.pause_ms -= gap
+        left = self._gap_counts[gap] - 1
+        if left:
+            self._gap_counts[gap] = left
+            return
+        del self._gap_counts[gap]
+        if gap == self.longest_pause_ms:
+            self.longest_pause_ms = max(self._gap_counts, default=0)
+
+    def _insert(self, word: Tuple[int, int, str]) -> None:
+        ws, we, _tok = word
+        i = bisect_right(self._starts, ws)  # 같은 시작시간이면 먼저 온 단어 뒤 (안정 정렬과 동일)
+        prev = self._words[i - 1] if i > 0 else None
+        nxt = self._words[i] if i < len(self._words) else None
+        self._starts.insert(i, ws)
+        self._words.insert(i, word)
+
+        self.speech_ms += max(0, we - ws)
+        if prev is not None and nxt is not None:
+            self._drop_gap(max(0, nxt[0] - prev[1]))
+        if prev is not None:
+            self._add_gap(max(0, ws - prev[1]))
+        if nxt is not None:
+            self._add_gap(max(0, nxt[0] - we))
+
+    def add_segment(self, segment: dict) -> None:
+        start = int(segment.get("start", 0))
+        self._extend(start, int(segment["end"]) if "end" in segment else None)
+        for w in segment.get("words", []):
+            t = _coerce_word(w)
+            if t is not None:
+                self._insert(t)
+
+    def add_words(self, words: List) -> None:
+        for w in words:
+            t = _coerce_word(w)
+            if t is not None:
+                self._extend(t[0], t[1])
+                self._insert(t)
+
+    def hypothesis_text(self) -> str:
+        return " ".join(tok for _ws, _we, tok in self._words if tok)
+
+    def metrics(self) -> SegMetrics:
+        start = self._start if self._start is not None else 0
+        end = max(self._end, start) if self._end is not None else start
+        total_ms = max(0, end - start)
+        n_words = len(self._words)
+        total_sec = max(total_ms / 1000.0, 1e-3)
+        speech_sec = max(self.speech_ms / 1000.0, 1e-3)
+        return SegMetrics(
+            total_ms=total_ms,
+            speech_ms=self.speech_ms,
+            pause_ms=self.pause_ms,
+            longest_pause_ms=self.longest_pause_ms,
+            n_words=n_words,
+            wps_total=round(n_words / total_sec, 2),
+            wps_art=round(n_words / speech_sec, 2),
+        )
+
+    def provisional(self) -> Dict:
+        """
+        지금까지 들어온 발화 기준 잠정 속도/공백 상태
+        """
+        m = self.metrics()
+        return {
+            "speed": _speed_from_metrics(m),
+            "gaps": _gaps_from_metrics(m),
+            "wpm_user": round(m.wps_total * 60.0, 1),
+            "pause_ms": m.pause_ms,
+            "longest_pause_ms": m.longest_pause_ms,
+            "total_ms": m.total_ms,
+            "speech_ms": m.speech_ms,
+            "n_words": m.n_words,
+        }
+
 # -------------------- 판정 로직 --------------------
 
 def _speed_from_metrics(user: SegMetrics) -> str:
@@ -208,30 +615,17 @@ def decide_issue(accuracy_ok: bool, speed: str, gaps: bool) -> Issue:
 
 # -------------------- 메인: 세그먼트 기반 분석 --------------------
 
-def analyze_feedback_with_segments(
-    *,
-    target_text: str,
-    result_text: str,
-    user_segments: List[dict],
-) -> Dict:
-    """
-    segments만으로 정확도/속도/공백을 분석한다.
-    """
-    # 1) 정확도(WER)
-    wer_val = _wer(target_text, result_text)
+def _analysis_dict(wer_val: float, m: SegMetrics) -> Dict:
     accuracy_ok = (wer_val <= WER_THRESHOLD)
 
-    # 2) 메트릭 추출
-    m = _metrics_from_segments(user_segments)
-
-    # 3) 속도/공백 판정
+    # 속도/공백 판정
     speed = _speed_from_metrics(m)
     gaps = _gaps_from_metrics(m)
 
-    # 4) 최종 이슈
+    # 최종 이슈
     issue = decide_issue(accuracy_ok, speed, gaps)
 
-    # 5) 반환 (WPM: 분당 단어수)
+    # 반환 (WPM: 분당 단어수)
     return {
         "issue": issue,
         "accuracy_ok": accuracy_ok,
@@ -249,3 +643,38 @@ def analyze_feedback_with_segments(
         "speech_ms": m.speech_ms,
         "n_words": m.n_words,
     }
+
+def analyze_feedback_with_segments(
+    *,
+    target_text: str,
+    result_text: str,
+    user_segments: Union[List[dict], WordTable],
+) -> Dict:
+    """
+    segments만으로 정확도/속도/공백을 분석한다.
+    (user_segments 자리에 WordTable.from_segments 결과를 바로 넘겨도 됨)
+    """
+    # 1) 정확도(WER)
+    with span("wer"):
+        wer_val = _wer(target_text, result_text)
+
+    # 2) 메트릭 추출
+    with span("segment_metrics"):
+        m = _metrics_from_segments(user_segments)
+
+    # 3~5) 판정 및 반환
+    return _analysis_dict(wer_val, m)
+
+def analyze_feedback_from_accumulator(
+    *,
+    target_text: str,
+    acc: SegmentAccumulator,
+    result_text: Optional[str] = None,
+) -> Dict:
+    """
+    스트리밍으로 누적한 메트릭으로 분석 (result_text가 없으면 누적된 단어로 가설 문장 구성)
+    """
+    hyp = result_text if result_text is not None else acc.hypothesis_text()
+    with span("wer"):
+        wer_val = _wer(target_text, hyp)
+    return _analysis_dict(wer_val, acc.metrics())
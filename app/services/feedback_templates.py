@@ -0,0 +1,110 @@
+# ------------------------------------------------------------
+# 피드백 문장 생성 경로 선택 (템플릿 / LLM / 하이브리드)
+# - template: 항상 로컬 템플릿 뱅크 사용 (업스트림 호출 없음)
+# - hybrid  : LLM을 마감 시간 안에서만 기다리고, 넘거나 실패하면 템플릿
+# - llm     : 항상 LLM 응답을 기다림 (기본값, 기존 동작. 서킷 open 시에만 템플릿)
+# 템플릿은 issue × wpm 구간별로 준비
+# accuracy 이슈는 단어 단위 교정이 필요해 모드와 관계없이 LLM 경로 (템플릿은 서킷 open 시 대체용)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import os
+import random
+from typing import Dict, List, Literal, Tuple
+
+from app.services.clova_client import call_clova
+from app.services.circuit_breaker import CircuitOpenError
+
+FeedbackMode = Literal["template", "hybrid", "llm"]
+FeedbackSource = Literal["template", "llm", "fallback"]
+
+# ===================== 튜닝 가능한 설정 =====================
+
+FEEDBACK_MODE: FeedbackMode = os.getenv("FEEDBACK_MODE", "llm")  # type: ignore[assignment]
+FEEDBACK_LLM_DEADLINE_SEC = float(os.getenv("FEEDBACK_LLM_DEADLINE", "3.0"))
+
+# wpm 구간 경계 (feedback_logic의 속도 임계치와 대략 맞춤: 1.0wps=60wpm, 1.9wps=114wpm)
+WPM_SLOW_MAX = 60.0
+WPM_FAST_MIN = 114.0
+
+# =============================================================
+
+# (issue, wpm 구간) → 후보 문장. 구간별 항목이 없으면 (issue, "any") 사용
+TEMPLATE_BANK: Dict[Tuple[str, str], List[str]] = {
+    ("good", "any"): [
+        "발음과 속도가 모두 좋으니 지금 리듬을 그대로 이어가세요.",
+        "자연스럽게 잘 말했으니 다음 문장도 같은 속도로 말해 보세요.",
+    ],
+    ("good", "slow"): [
+        "정확하게 잘 말했으니 다음에는 조금 더 자연스러운 속도로 이어가 보세요.",
+    ],
+    ("speed_fast", "any"): [
+        "속도가 빠르니 호흡을 고르고 조금 천천히 또박또박 말해 보세요.",
+        "말이 빠른 편이니 한 단어씩 여유를 두고 자연스럽게 말해 보세요.",
+    ],
+    ("speed_slow", "any"): [
+        "속도가 느리니 조금 더 빠르게 한 호흡으로 이어 말해 보세요.",
+        "말이 느린 편이니 끊지 말고 조금 빠르게 이어서 말해 보세요.",
+    ],
+    ("gaps", "any"): [
+        "단어 사이 쉬는 시간이 기니 단어를 붙여서 자연스럽게 이어 말해 보세요.",
+        "중간에 멈춤이 길었으니 한 호흡으로 끊지 말고 이어 말해 보세요.",
+    ],
+    # 업스트림 장애 시 대체용 (정상 경로에서는 accuracy를 템플릿으로 답하지 않음)
+    ("accuracy", "any"): [
+        "기준 문장과 다른 단어가 있으니 문장을 다시 보고 천천히 정확하게 말해 보세요.",
+    ],
+}
+
+
+def _wpm_bucket(wpm_user: float) -> str:
+    if wpm_user <= WPM_SLOW_MAX:
+        return "slow"
+    if wpm_user >= WPM_FAST_MIN:
+        return "fast"
+    return "ok"
+
+
+def template_feedback(issue: str, wpm_user: float) -> str:
+    """
+    issue/wpm 구간에 맞는 템플릿 문장 하나 선택
+    """
+    candidates = TEMPLATE_BANK.get((issue, _wpm_bucket(wpm_user))) or TEMPLATE_BANK[(issue, "any")]
+    return random.choice(candidates)
+
+
+async def produce_feedback_text(
+    messages: list[dict],
+    *,
+    issue: str,
+    wpm_user: float,
+    mode: FeedbackMode | None = None,
+) -> Tuple[str, FeedbackSource]:
+    """
+    모드에 따라 피드백 문장을 만들고, 어느 경로가 응답했는지 함께 반환
+    """
+    mode = mode or FEEDBACK_MODE
+    if issue == "accuracy":
+        # 틀린 단어를 짚어 주는 문장은 템플릿으로 만들 수 없음
+        mode = "llm"
+    if mode == "template":
+        return template_feedback(issue, wpm_user), "template"
+
+    if mode == "llm":
+        try:
+            text = await call_clova(messages, endpoint="feedback")
+        except CircuitOpenError:
+            # 업스트림 장애 중: 분석 결과 + 템플릿 문장으로 축소 응답
+            return template_feedback(issue, wpm_user), "fallback"
+        return text.strip().replace("\n", " "), "llm"
+
+    # hybrid: 마감 시간 초과/업스트림 오류 시 템플릿으로 대체
+    try:
+        text = await asyncio.wait_for(
+            call_clova(messages, endpoint="feedback"),
+            timeout=FEEDBACK_LLM_DEADLINE_SEC,
+        )
+    except Exception:
+        return template_feedback(issue, wpm_user), "fallback"
+    return text.strip().replace("\n", " "), "llm"
@@ -0,0 +1,133 @@
+# ------------------------------------------------------------
+# 업스트림 요청 헤징 (tail latency 완화)
+# - 첫 요청이 최근 지연 분포의 백분위(p95 등)를 넘도록 응답이 없으면 같은 요청을 한 번 더 보냄
+# - 먼저 성공한 응답을 쓰고 나머지는 취소
+# - 엔드포인트별 헤지 예산: 요청 1건당 budget_ratio만큼 적립, 헤지 1건에 1 소모
+# - 기본 off, 엔드포인트별로 켬
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, TypeVar
+
+T = TypeVar("T")
+
+# ===================== 튜닝 가능한 설정 =====================
+
+HEDGE_ENDPOINTS: Dict[str, bool] = {
+    "feedback": os.getenv("CLOVA_HEDGE_FEEDBACK", "0") == "1",
+    "learning": os.getenv("CLOVA_HEDGE_LEARNING", "0") == "1",
+    "chat": os.getenv("CLOVA_HEDGE_CHAT", "0") == "1",
+}
+HEDGE_PERCENTILE = float(os.getenv("CLOVA_HEDGE_PERCENTILE", "95"))     # 헤지 지연 기준 백분위
+HEDGE_BUDGET_RATIO = float(os.getenv("CLOVA_HEDGE_BUDGET", "0.05"))     # 추가 호출 허용 비율 (5%)
+HEDGE_BUDGET_BURST = float(os.getenv("CLOVA_HEDGE_BURST", "10"))        # 적립 가능한 최대 헤지 수
+HEDGE_MIN_DELAY_SEC = float(os.getenv("CLOVA_HEDGE_MIN_DELAY", "0.3"))  # 헤지 지연 하한(s)
+HEDGE_INITIAL_DELAY_SEC = float(os.getenv("CLOVA_HEDGE_INITIAL_DELAY", "2.0"))  # 표본 부족 시 지연(s)
+HEDGE_WINDOW = int(os.getenv("CLOVA_HEDGE_WINDOW", "200"))              # 백분위 계산용 최근 표본 수
+HEDGE_MIN_SAMPLES = 20
+
+# =============================================================
+
+
+class HedgePolicy:
+    def __init__(self, endpoint: str, enabled: bool):
+        self.endpoint = endpoint
+        self.enabled = enabled
+        self._latencies: Deque[float] = deque(maxlen=HEDGE_WINDOW)
+        self._credits = HEDGE_BUDGET_BURST
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def delay(self) -> float:
+        if len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_INITIAL_DELAY_SEC
+        ordered = sorted(self._latencies)
+        idx = min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE / 100.0))
+        return max(HEDGE_MIN_DELAY_SEC, ordered[idx])
+
+    def _earn(self) -> None:
+        self.requests += 1
+        self._credits = min(HEDGE_BUDGET_BURST, self._credits + HEDGE_BUDGET_RATIO)
+
+    def _spend(self) -> bool:
+        if self._credits >= 1:
+            self._credits -= 1
+            return True
+        self.budget_denied += 1
+        return False
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        fn을 호출하고, 지연되면 한 번 더 호출해 먼저 성공한 결과 반환
+        """
+        if not self.enabled:
+            return await fn()
+        self._earn()
+
+        async def timed() -> T:
+            start = time.monotonic()
+            result = await fn()
+            self.record(time.monotonic() - start)
+            return result
+
+        first = asyncio.ensure_future(timed())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay())
+            if done or not self._spend():
+                return await first
+
+            self.hedged += 1
+            second = asyncio.ensure_future(timed())
+            tasks.add(second)
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "delay_ms": round(1000 * self.delay(), 1),
+            "samples": len(self._latencies),
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "budget_credits": round(self._credits, 2),
+        }
+
+
+_policies: Dict[str, HedgePolicy] = {ep: HedgePolicy(ep, on) for ep, on in HEDGE_ENDPOINTS.items()}
+
+
+async def hedged(endpoint: str | None, fn: Callable[[], Awaitable[T]]) -> T:
+    policy = _policies.get(endpoint or "")
+    if policy is None:
+        return await fn()
+    return await policy.run(fn)
+
+
+def hedge_stats() -> dict:
+    return {ep: p.stats() for ep, p in _policies.items()}
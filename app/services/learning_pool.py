@@ -0,0 +1,200 @@
+# ------------------------------------------------------------
+# 학습 콘텐츠(단어/문장) 사전 생성 풀
+# - /api/learning 요청은 사용자 입력이 없는 랜덤 항목이므로 미리 만들어 둔다
+# - 백그라운드 태스크가 low/high 워터마크 사이로 풀을 유지
+# - 최근 제공한 항목과 중복되는 결과는 버린다
+# - 풀이 비어 있으면 업스트림을 직접 호출(fallback)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import math
+import os
+import random
+from collections import deque
+from typing import Deque, Dict, Set
+
+from app.services.prompt_builder import build_learning_prompts
+from app.services.clova_client import call_clova
+from app.services.upstream_scheduler import UpstreamBusyError
+
+# ===================== 튜닝 가능한 설정 =====================
+
+POOL_ENABLED = os.getenv("LEARNING_POOL_ENABLED", "1") == "1"
+POOL_LOW_WATERMARK = int(os.getenv("LEARNING_POOL_LOW", "5"))          # 이 개수 미만이면 보충 시작
+POOL_HIGH_WATERMARK = int(os.getenv("LEARNING_POOL_HIGH", "20"))       # 이 개수까지 채움
+# 위 워터마크는 인스턴스 전체 기준 → 워커(app.server가 설정)끼리 나눠 부팅 시 사전 생성 호출이 워커 수만큼 늘지 않게
+WORKER_SHARE = max(1, int(os.getenv("SERVER_WORKER_COUNT", "1")))
+POOL_LOW_WATERMARK = math.ceil(POOL_LOW_WATERMARK / WORKER_SHARE)
+POOL_HIGH_WATERMARK = max(POOL_LOW_WATERMARK, math.ceil(POOL_HIGH_WATERMARK / WORKER_SHARE))
+POOL_REFILL_CONCURRENCY = int(os.getenv("LEARNING_POOL_CONCURRENCY", "4"))  # 보충 시 동시 호출 수
+POOL_RECENT_SIZE = int(os.getenv("LEARNING_POOL_RECENT", "50"))        # 중복 검사용 최근 제공 항목 수
+POOL_CHECK_INTERVAL = float(os.getenv("LEARNING_POOL_INTERVAL", "1.0"))  # 워터마크 점검 주기(s)
+POOL_ERROR_BACKOFF = float(os.getenv("LEARNING_POOL_BACKOFF", "5.0"))    # 보충 실패 시 대기(s)
+
+LEARNING_TYPES = ("word", "sentence")
+
+# =============================================================
+
+
+class LearningPool:
+    """
+    한 유형(word/sentence)의 사전 생성 풀
+    """
+
+    def __init__(self, request_type: str):
+        self.request_type = request_type
+        self.items: Deque[str] = deque()
+        self._recent: Deque[str] = deque()
+        self._recent_set: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.errors = 0
+        self.degraded = 0
+
+    async def _generate(self) -> str:
+        messages = build_learning_prompts(self.request_type)
+        result = await call_clova(messages, endpoint="learning")
+        return result.strip()
+
+    def _remember(self, item: str) -> None:
+        # 최근 제공 목록(고정 크기) 갱신
+        self._recent.append(item)
+        self._recent_set.add(item)
+        while len(self._recent) > POOL_RECENT_SIZE:
+            self._recent_set.discard(self._recent.popleft())
+
+    def _is_duplicate(self, item: str) -> bool:
+        return item in self._recent_set or item in self.items
+
+    def take(self) -> str | None:
+        """
+        풀에서 하나 꺼냄 (없으면 None)
+        """
+        if not self.items:
+            return None
+        item = self.items.popleft()
+        self._remember(item)
+        if len(self.items) < POOL_LOW_WATERMARK:
+            self._wakeup.set()
+        return item
+
+    async def get(self) -> str:
+        """
+        풀에서 꺼내고, 비어 있으면 업스트림 직접 호출
+        - 업스트림이 막혀 있으면(서킷 open/호출 한도) 최근 제공 항목을 재사용
+        """
+        item = self.take()
+        if item is not None:
+            self.hits += 1
+            return item
+        self.misses += 1
+        self._wakeup.set()
+        try:
+            item = await self._generate()
+        except UpstreamBusyError:
+            if not self._recent:
+                raise
+            self.degraded += 1
+            return random.choice(self._recent)
+        self._remember(item)
+        return item
+
+    async def refill(self) -> None:
+        """
+        high 워터마크까지 배치 단위로 채움
+        - 한 배치가 전부 중복/실패면 이번 라운드는 중단(핫루프 방지)
+        """
+        while len(self.items) < POOL_HIGH_WATERMARK:
+            batch = min(POOL_REFILL_CONCURRENCY, POOL_HIGH_WATERMARK - len(self.items))
+            results = await asyncio.gather(
+                *(self._generate() for _ in range(batch)),
+                return_exceptions=True,
+            )
+            added = 0
+            for r in results:
+                if isinstance(r, BaseException):
+                    self.errors += 1
+                    continue
+                self.generated += 1
+                if not r or self._is_duplicate(r):
+                    self.duplicates += 1
+                    continue
+                self.items.append(r)
+                added += 1
+            if added == 0:
+                if self.errors and all(isinstance(r, BaseException) for r in results):
+                    raise RuntimeError(f"learning pool refill failed: {self.request_type}")
+                return
+
+    async def run(self) -> None:
+        """
+        백그라운드 루프: low 워터마크 아래로 내려가면 보충
+        """
+        while True:
+            if len(self.items) < POOL_LOW_WATERMARK:
+                try:
+                    await self.refill()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    await asyncio.sleep(POOL_ERROR_BACKOFF)
+                    continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=POOL_CHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.items),
+            "low_watermark": POOL_LOW_WATERMARK,
+            "high_watermark": POOL_HIGH_WATERMARK,
+            "hits": self.hits,
+            "misses": self.misses,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "errors": self.errors,
+            "degraded": self.degraded,
+        }
+
+
+_pools: Dict[str, LearningPool] = {t: LearningPool(t) for t in LEARNING_TYPES}
+_tasks: list[asyncio.Task] = []
+
+
+async def start_pools() -> None:
+    """
+    백그라운드 보충 태스크 시작 (lifespan에서 호출)
+    """
+    if not POOL_ENABLED or _tasks:
+        return
+    for pool in _pools.values():
+        _tasks.append(asyncio.create_task(pool.run()))
+
+
+async def stop_pools() -> None:
+    """
+    백그라운드 보충 태스크 종료 (lifespan에서 호출)
+    """
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+
+
+async def get_learning_item(request_type: str) -> str:
+    """
+    학습 콘텐츠 1개 반환 (풀 → 없으면 직접 생성)
+    """
+    if request_type not in _pools:
+        raise ValueError("Invalid request type")
+    return await _pools[request_type].get()
+
+
+def pool_stats() -> dict:
+    return {t: p.stats() for t, p in _pools.items()}
@@ -0,0 +1,225 @@
+# ------------------------------------------------------------
+# Prometheus 텍스트 형식 지표 (외부 라이브러리/수집기 없이 /metrics로 제공)
+# - Counter / Gauge / Histogram (레이블 지원)
+# - 라우트별 요청 수·지연, 업스트림 모델별 지연·상태·토큰 사용량·대기열 길이/대기 시간,
+#   진행 중 요청 수, 단계별(분석/프롬프트/업스트림) 지연
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels_text(self.labelnames, key)} {_fmt(v)}"
+            for key, v in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels_text(self.labelnames, key)} {_fmt(v)}"
+            for key, v in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * len(self.buckets)
+            self._sums[key] = 0.0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = 'le="' + _fmt(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels_text(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.labelnames, key)} {_fmt(self._sums[key])}")
+            lines.append(f"{self.name}_count{_labels_text(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# ===================== 지표 정의 =====================
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "talkie_http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "talkie_http_request_duration_seconds", "HTTP request latency by route", ["method", "route"]))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "talkie_http_requests_in_flight", "HTTP requests currently being served"))
+
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "talkie_upstream_request_duration_seconds", "Clova request latency by model", ["model"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0)))
+UPSTREAM_RESPONSES = REGISTRY.register(Counter(
+    "talkie_upstream_responses_total", "Clova responses by model and status (error = transport failure)",
+    ["model", "status"]))
+UPSTREAM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "talkie_upstream_requests_in_flight", "Clova requests currently in flight", ["model"]))
+UPSTREAM_TOKENS = REGISTRY.register(Counter(
+    "talkie_upstream_tokens_total", "Clova token usage by model and kind (input/output)", ["model", "kind"]))
+UPSTREAM_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "talkie_upstream_queue_depth", "Requests waiting in the upstream scheduler queue", ["model"]))
+UPSTREAM_QUEUE_WAIT = REGISTRY.register(Histogram(
+    "talkie_upstream_queue_wait_seconds", "Time spent waiting in the upstream scheduler queue", ["model"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0)))
+
+MODEL_ROUTE_DECISIONS = REGISTRY.register(Counter(
+    "talkie_model_route_total", "Model routing decisions by endpoint, chosen model and reason",
+    ["endpoint", "model", "reason"]))
+MODEL_LATENCY_P95 = REGISTRY.register(Gauge(
+    "talkie_model_latency_p95_seconds", "Rolling p95 of completed Clova calls used for routing", ["model"]))
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "talkie_stage_duration_seconds", "Latency of internal processing stages", ["stage"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0)))
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    """
+    라우트별 요청 수/지연, 진행 중 요청 수 기록 (ASGI 미들웨어, 스트리밍 응답도 끝까지 측정)
+    - route 레이블은 경로 템플릿(예: /api/chat/sessions/{session_id})을 써서 카디널리티 제한
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope.get("method", "")
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_LATENCY.observe(time.perf_counter() - start, method=method, route=route)
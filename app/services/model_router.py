@@ -0,0 +1,237 @@
+# ------------------------------------------------------------
+# 모델 라우팅 (엔드포인트 → Clova 모델 프로필)
+# - 모델 프로필: API 버전(v1/v3) + 샘플링 파라미터. 기본값은 아래, CLOVA_MODEL_PROFILES(JSON)로 덮어씀
+#     CLOVA_MODEL_PROFILES='{"HCX-003": {"params": {"temperature": 0.6}}, "HCX-005": {"api": "v3"}}'
+# - 엔드포인트별 경로: 기본 모델(primary) + 선택적 대체 모델(fallback)과 p95 예산
+#     CLOVA_ROUTE_CHAT_MODEL=HCX-003  CLOVA_ROUTE_CHAT_FALLBACK=HCX-DASH-002  CLOVA_ROUTE_CHAT_P95_BUDGET=6
+# - 모델별 최근 완료 호출 지연을 추적해, primary의 p95가 예산을 넘거나 브레이커가 열려 있으면 fallback으로
+#   (넘는 동안에도 일부(probe)는 primary로 보내 지연 표본을 갱신 → 회복되면 자동 복귀)
+# - 결정은 /metrics(talkie_model_route_total)와 /stats(model_routing)에 노출
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import json
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Tuple
+
+from app.services.circuit_breaker import breaker_for
+from app.services.metrics import MODEL_LATENCY_P95, MODEL_ROUTE_DECISIONS
+
+# ===================== 튜닝 가능한 설정 =====================
+
+# 엔드포인트별 (기본 모델, 대체 모델, p95 예산(s)). 대체 모델이 비어 있거나 예산 ≤ 0 이면 항상 기본 모델
+ROUTES: Dict[str, Tuple[str, str, float]] = {
+    "learning": (
+        os.getenv("CLOVA_ROUTE_LEARNING_MODEL", "HCX-DASH-002"),
+        os.getenv("CLOVA_ROUTE_LEARNING_FALLBACK", ""),
+        float(os.getenv("CLOVA_ROUTE_LEARNING_P95_BUDGET", "0")),
+    ),
+    "feedback": (
+        os.getenv("CLOVA_ROUTE_FEEDBACK_MODEL", "HCX-DASH-002"),
+        os.getenv("CLOVA_ROUTE_FEEDBACK_FALLBACK", ""),
+        float(os.getenv("CLOVA_ROUTE_FEEDBACK_P95_BUDGET", "0")),
+    ),
+    "chat": (
+        os.getenv("CLOVA_ROUTE_CHAT_MODEL", "HCX-003"),
+        os.getenv("CLOVA_ROUTE_CHAT_FALLBACK", "HCX-DASH-002"),
+        float(os.getenv("CLOVA_ROUTE_CHAT_P95_BUDGET", "6.0")),
+    ),
+}
+DEFAULT_MODEL = os.getenv("CLOVA_DEFAULT_MODEL", "HCX-DASH-002")            # 경로가 없는 호출(스크립트 등)
+
+ROUTE_PROBE_RATE = float(os.getenv("CLOVA_ROUTE_PROBE_RATE", "0.05"))        # 예산 초과 중 primary로 보낼 비율
+LATENCY_WINDOW = int(os.getenv("CLOVA_ROUTE_LATENCY_WINDOW", "200"))         # 모델별 최근 표본 수
+LATENCY_MAX_AGE_SEC = float(os.getenv("CLOVA_ROUTE_LATENCY_MAX_AGE", "300"))  # 이보다 오래된 표본은 무시(s)
+LATENCY_MIN_SAMPLES = int(os.getenv("CLOVA_ROUTE_MIN_SAMPLES", "20"))         # 판정에 필요한 최소 표본
+P95_REFRESH_SEC = 1.0                                                        # p95 재계산 주기(s)
+
+# =============================================================
+
+# 기본 모델 프로필 (기존 call_clova_studio / call_clova_chat 의 고정값)
+_BUILTIN_PROFILES: Dict[str, dict] = {
+    "HCX-DASH-002": {
+        "api": "v3",
+        "params": {
+            "topP": 0.8,
+            "topK": 0,
+            "temperature": 0.8,
+            "maxTokens": 100,
+            "repeatPenalty": 1.1,
+            "stopBefore": [],
+            "seed": 0,
+            "includeTokens": False,
+        },
+    },
+    "HCX-003": {
+        "api": "v1",
+        "params": {
+            "topP": 0.8,
+            "topK": 0,
+            "temperature": 0.8,
+            "maxTokens": 100,
+            "repeatPenalty": 5.0,  # v1 repeatPenalty는 v3와 범위가 다름
+            "stopBefore": [],
+            "includeTokens": False,
+        },
+    },
+}
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    name: str
+    api: str
+    params: Dict[str, object] = field(default_factory=dict)
+
+    def url(self, base_url: str) -> str:
+        return f"{base_url}/{self.api}/chat-completions/{self.name}"
+
+    def payload(self, messages: list[dict]) -> dict:
+        return {"messages": messages, **self.params}
+
+
+def _load_profiles() -> Dict[str, ModelProfile]:
+    specs = {name: {"api": s["api"], "params": dict(s["params"])} for name, s in _BUILTIN_PROFILES.items()}
+    raw = os.getenv("CLOVA_MODEL_PROFILES", "")
+    if raw:
+        overrides = json.loads(raw)
+        if not isinstance(overrides, dict):
+            raise ValueError("CLOVA_MODEL_PROFILES는 {모델명: {api, params}} 형태의 JSON이어야 합니다.")
+        for name, override in overrides.items():
+            spec = specs.setdefault(name, {"api": "v3", "params": {}})
+            spec["api"] = override.get("api", spec["api"])
+            spec["params"].update(override.get("params", {}))
+    for name, spec in specs.items():
+        if spec["api"] not in ("v1", "v3"):
+            raise ValueError(f"{name}: 지원하지 않는 API 버전입니다 ({spec['api']}).")
+    return {name: ModelProfile(name, spec["api"], spec["params"]) for name, spec in specs.items()}
+
+
+class LatencyTracker:
+    """
+    모델별 최근 완료 호출 지연 (시각, 지연) — p95는 P95_REFRESH_SEC마다 한 번만 재계산
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=LATENCY_WINDOW)
+        self._p95: Optional[float] = None
+        self._computed_at = float("-inf")
+
+    def observe(self, latency: float) -> None:
+        self._samples.append((time.monotonic(), latency))
+
+    def p95(self) -> Optional[float]:
+        """
+        최근 표본의 p95(s). 표본이 부족하면 None
+        """
+        now = time.monotonic()
+        if now - self._computed_at < P95_REFRESH_SEC:
+            return self._p95
+        self._computed_at = now
+        while self._samples and now - self._samples[0][0] > LATENCY_MAX_AGE_SEC:
+            self._samples.popleft()
+        if len(self._samples) < LATENCY_MIN_SAMPLES:
+            self._p95 = None
+            return None
+        ordered = sorted(latency for _t, latency in self._samples)
+        self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        MODEL_LATENCY_P95.set(self._p95, model=self.model)
+        return self._p95
+
+    def stats(self) -> dict:
+        p95 = self.p95()
+        return {
+            "samples": len(self._samples),
+            "p95_ms": round(1000 * p95, 1) if p95 is not None else None,
+        }
+
+
+@dataclass
+class Route:
+    endpoint: str
+    primary: str
+    fallback: Optional[str]
+    p95_budget: float
+    decisions: Dict[str, int] = field(default_factory=dict)  # "모델/사유" → 횟수
+
+
+class ModelRouter:
+    def __init__(self, profiles: Dict[str, ModelProfile], routes: Dict[str, Tuple[str, str, float]]):
+        self.profiles = profiles
+        self.routes: Dict[str, Route] = {}
+        for endpoint, (primary, fallback, budget) in routes.items():
+            for model in (primary, fallback):
+                if model and model not in profiles:
+                    raise ValueError(f"{endpoint}: 프로필이 없는 모델입니다 ({model}).")
+            self.routes[endpoint] = Route(endpoint, primary, fallback or None, budget)
+        if DEFAULT_MODEL not in profiles:
+            raise ValueError(f"CLOVA_DEFAULT_MODEL: 프로필이 없는 모델입니다 ({DEFAULT_MODEL}).")
+        self._trackers: Dict[str, LatencyTracker] = {}
+
+    def tracker(self, model: str) -> LatencyTracker:
+        tracker = self._trackers.get(model)
+        if tracker is None:
+            tracker = self._trackers[model] = LatencyTracker(model)
+        return tracker
+
+    def observe(self, model: str, latency: float) -> None:
+        """
+        완료된 호출의 전체 지연 기록 (clova_client에서 성공/타임아웃 시 호출)
+        """
+        self.tracker(model).observe(latency)
+
+    def _decide(self, route: Route) -> Tuple[str, str]:
+        if route.fallback is None:
+            return route.primary, "primary"
+        if breaker_for(route.primary).state == "open" and breaker_for(route.fallback).state != "open":
+            return route.fallback, "breaker_open"
+        if route.p95_budget > 0:
+            p95 = self.tracker(route.primary).p95()
+            if p95 is not None and p95 > route.p95_budget:
+                if random.random() < ROUTE_PROBE_RATE:
+                    return route.primary, "probe"
+                return route.fallback, "over_budget"
+        return route.primary, "primary"
+
+    def route(self, endpoint: str | None) -> ModelProfile:
+        """
+        이번 호출에 쓸 모델 프로필 선택
+        """
+        route = self.routes.get(endpoint or "")
+        if route is None:
+            model, reason = DEFAULT_MODEL, "default"
+        else:
+            model, reason = self._decide(route)
+            key = f"{model}/{reason}"
+            route.decisions[key] = route.decisions.get(key, 0) + 1
+        MODEL_ROUTE_DECISIONS.inc(endpoint=endpoint or "other", model=model, reason=reason)
+        return self.profiles[model]
+
+    def stats(self) -> dict:
+        return {
+            "routes": {
+                ep: {
+                    "primary": r.primary,
+                    "fallback": r.fallback,
+                    "p95_budget_ms": round(1000 * r.p95_budget, 1) if r.fallback and r.p95_budget > 0 else None,
+                    "decisions": dict(r.decisions),
+                }
+                for ep, r in self.routes.items()
+            },
+            "models": {
+                name: {"api": p.api, **self.tracker(name).stats()}
+                for name, p in self.profiles.items()
+            },
+        }
+
+
+model_router = ModelRouter(_load_profiles(), ROUTES)
+
+
+def routing_stats() -> dict:
+    return model_router.stats()
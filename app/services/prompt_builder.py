@@ -1,72 +1,82 @@
-from app.constants.topics import TOPIC_PROMPTS
+import os
+from dataclasses import dataclass
+from app.services.prompt_registry import prompt_registry
+from app.services.token_estimator import estimate_message_tokens
 from typing import List, Dict
 
-# 단어, 문장 생성용 프롬프트
+# 단어, 문장 생성용 프롬프트 (레지스트리에 미리 컴파일된 메시지 사용)
 def build_learning_prompts(request_type: str) -> list[dict]:
-    if request_type == "word":
-        return [
-            {
-                "role": "system",
-                "content": (
-                    "너는 성인의 한국어 학습을 위한 단어 생성기야.\n\n"
-                    "조건은 다음과 같아:\n\n"
-                    "1. 일상생활에서 자주 사용하는, 쉬운 한국어 단어 '1개만' 출력해야 해.\n"
-                    "2. 출력은 오직 단어 '하나'만, 설명 없이. 예: 떡볶이\n"
-                    "3. 음식, 운동, 음악, 여행, 날씨, 동물, 영화/드라마, 책, 물건, 회의, 병원, 대중교통 등 주제 안에서 랜덤으로 단어 1개만 선택해.\n"
-                    "4. 절대 설명하지 마. 추가 문장, 부연설명, 예시, 포맷팅, 강조표현 사용 금지.\n"
-                    "5. 딱 하나의 단어만 줄 바꿈 없이 출력해. 예: 버스\n\n"
-                    "지시를 어기면 학습자가 헷갈릴 수 있어. 무조건 단어 하나만 출력해."
-                )
-            },
-            {
-                "role": "user",
-                "content": "단어 생성"
-            }
-        ]
-    
-    elif request_type == "sentence":
-        return [
-            {
-                "role": "system",
-                "content": (
-                    "너는 성인의 한국어 학습을 위한 문장 생성기야.\n\n"
-                    "조건은 다음과 같아:\n\n"
-                    "1. 일상생활에서 자주 사용하는, 짧은 한국어 문장을 출력해야 해.\n"
-                    "2. 출력은 오직 문장 '하나'만, 설명 없이.\n"
-                    "3. 음식, 운동, 음악, 여행, 날씨, 동물, 영화/드라마, 책, 물건, 회의, 병원, 대중교통 등 주제 안에서 랜덤으로 문장 1개만 선택해.\n"
-                    "4. 절대 설명하지 마. 추가 문장, 부연설명, 예시, 포맷팅, 강조표현 사용 금지.\n"
-                    "5. 딱 하나의 문장만 줄 바꿈 없이 출력해.\n\n"
-                    "지시를 어기면 학습자가 헷갈릴 수 있어. 무조건 짧은 문장 하나만 출력해."
-                )
-            },
-            {
-                "role": "user",
-                "content": "문장 생성"
-            }
-        ]
-    else:
-        raise ValueError("Invalid request type")
+    return list(prompt_registry.learning(request_type).messages)
 
 
 
 # 자유 대화용 프롬프트
-def build_chat_prompt(topic: str, history: list[dict], user_input: str | None) -> list[dict]:
-    if topic not in TOPIC_PROMPTS:
-        raise ValueError(f"Unknown topic: {topic}")
-    
-    system_message = {"role": "system", "content": TOPIC_PROMPTS[topic]}
-    messages = [system_message]
 
-    # 이전 대화 히스토리 추가
-    messages.extend(history)
+# 대화 프롬프트 토큰 예산 (추정치 기준). 시스템 프롬프트와 최근 N개 메시지는 항상 유지
+CHAT_PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "3000"))
+CHAT_KEEP_RECENT_MESSAGES = int(os.getenv("CHAT_KEEP_RECENT_MESSAGES", "6"))
+
+@dataclass
+class PromptTokenStats:
+    tokens_before: int     # 압축 전 추정 토큰 수
+    tokens_after: int      # 압축 후 추정 토큰 수
+    dropped_messages: int  # 제외한 과거 메시지 수
+
+def _compact_history(
+    history: list[dict], fixed_tokens: int, budget: int, keep_recent: int
+) -> tuple[list[dict], int, int]:
+    """
+    예산을 넘으면 가장 오래된 메시지부터 제외
+    - 최근 keep_recent개는 예산을 넘더라도 유지
+    반환: (압축된 history, 압축 전 history 토큰, 압축 후 history 토큰)
+    """
+    costs = [estimate_message_tokens(m) for m in history]
+    total = sum(costs)
+    droppable = max(0, len(history) - keep_recent)
+    drop = 0
+    kept = total
+    while drop < droppable and fixed_tokens + kept > budget:
+        kept -= costs[drop]
+        drop += 1
+    return history[drop:], total, kept
+
+def build_chat_prompt_with_stats(
+    topic: str,
+    history: list[dict],
+    user_input: str | None,
+    *,
+    token_budget: int | None = None,
+    keep_recent: int | None = None,
+) -> tuple[list[dict], PromptTokenStats]:
+    prefix = prompt_registry.chat(topic)  # 모르는 주제면 ValueError
+
+    budget = CHAT_PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+    keep = CHAT_KEEP_RECENT_MESSAGES if keep_recent is None else keep_recent
 
-    # user_input이 있다면 추가
+    # user_input이 있다면 추가, 없으면 대화 시작 상황
     if user_input is not None:
-        messages.append({"role": "user", "content": user_input})
+        last_message = {"role": "user", "content": user_input}
     else:
-        # 대화 시작 상황
-        messages.append({"role": "user", "content": "대화 시작"})
+        last_message = {"role": "user", "content": "대화 시작"}
+
+    fixed_tokens = prefix.tokens + estimate_message_tokens(last_message)
+
+    # 이전 대화 히스토리 추가 (토큰 예산 내로 압축)
+    kept_history, before, after = _compact_history(history, fixed_tokens, budget, keep)
 
+    messages = list(prefix.messages)
+    messages.extend(kept_history)
+    messages.append(last_message)
+
+    stats = PromptTokenStats(
+        tokens_before=fixed_tokens + before,
+        tokens_after=fixed_tokens + after,
+        dropped_messages=len(history) - len(kept_history),
+    )
+    return messages, stats
+
+def build_chat_prompt(topic: str, history: list[dict], user_input: str | None) -> list[dict]:
+    messages, _stats = build_chat_prompt_with_stats(topic, history, user_input)
     return messages
 
 
@@ -111,16 +121,6 @@ def build_feedback_messages(
     wpm_user: float,     # 분당 단어수
 ) -> List[dict]:
     
-    # 시스템 규칙: 반드시 한 문장, 한국어, 과도한 친절말투/감탄사 남용 금지
-    system_content = (
-        "너는 성인 한국어 학습자를 위한 간단 피드백 생성기다.\n"
-        "지침:\n"
-        "1) 한국어로 한 문장만 생성한다. 2) 50자 이내를 권장한다.\n"
-        "3) 이모지, 특수문자, 따옴표, 마크다운, 순번, 불릿 사용 금지.\n"
-        "4) 장황한 설명, 반복, 사족 금지. 5) 존대하되 단정적으로 짧게.\n"
-        "6) 아래 분석 결과를 반영해 가장 중요한 한 가지만 명확히 조언한다."
-    )
-
     # 이슈별 지시
     instruction = _issue_instruction(issue, speed, gaps)
 
@@ -138,7 +138,7 @@ def build_feedback_messages(
         "출력 형식: 한국어 한 문장. 조언 핵심만 간결히. 추가 문장, 인용부호, 이모지 금지."
     )
 
-    return [
-        {"role": "system", "content": system_content},
-        {"role": "user", "content": user_content},
-    ]
\ No newline at end of file
+    # 시스템 규칙은 레지스트리에 미리 컴파일된 메시지 사용
+    messages = list(prompt_registry.feedback_system.messages)
+    messages.append({"role": "user", "content": user_content})
+    return messages
\ No newline at end of file
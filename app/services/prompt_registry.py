@@ -0,0 +1,89 @@
+# ------------------------------------------------------------
+# 프롬프트 레지스트리
+# - 모든 고정 프롬프트(주제별 대화, 학습 콘텐츠, 피드백 시스템 규칙)를
+#   모듈 로드 시 한 번만 컴파일하고 검증
+# - 불변 메시지 prefix + 추정 토큰 수를 미리 계산해 보관
+# - 요청마다 하는 일은 prefix 튜플을 리스트로 복사하는 것뿐
+# ------------------------------------------------------------
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from app.constants.topics import Topic, TOPIC_PROMPTS
+from app.constants.prompts import LEARNING_PROMPTS, FEEDBACK_SYSTEM_PROMPT
+from app.services.token_estimator import estimate_messages_tokens
+
+
+class FrozenMessage(dict):
+    """
+    수정 불가 메시지 dict
+    - dict 하위 클래스라 JSON 직렬화/캐시 키 계산은 그대로 동작
+    - 여러 요청이 같은 객체를 공유하므로 변경 시도는 TypeError
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("compiled prompt messages are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    key: str
+    messages: Tuple[FrozenMessage, ...]
+    tokens: int  # 추정 토큰 수
+
+
+def _compile(key: str, *messages: Tuple[str, str]) -> CompiledPrompt:
+    frozen = []
+    for role, content in messages:
+        if not content or not content.strip():
+            raise ValueError(f"empty prompt: {key}")
+        if "$" in content:
+            raise ValueError(f"unresolved template parameter in prompt: {key}")
+        frozen.append(FrozenMessage(role=role, content=content))
+    return CompiledPrompt(key=key, messages=tuple(frozen), tokens=estimate_messages_tokens(frozen))
+
+
+class PromptRegistry:
+    def __init__(self):
+        missing = [t.value for t in Topic if t.value not in TOPIC_PROMPTS]
+        if missing:
+            raise ValueError(f"topics without prompt: {missing}")
+
+        self._chat: Dict[Topic, CompiledPrompt] = {
+            topic: _compile(f"chat:{topic.value}", ("system", TOPIC_PROMPTS[topic.value]))
+            for topic in Topic
+        }
+        self._learning: Dict[str, CompiledPrompt] = {
+            request_type: _compile(f"learning:{request_type}", ("system", system), ("user", user))
+            for request_type, (system, user) in LEARNING_PROMPTS.items()
+        }
+        self.feedback_system = _compile("feedback:system", ("system", FEEDBACK_SYSTEM_PROMPT))
+
+    def chat(self, topic: str) -> CompiledPrompt:
+        try:
+            return self._chat[Topic(topic)]
+        except ValueError:
+            raise ValueError(f"Unknown topic: {topic}") from None
+
+    def learning(self, request_type: str) -> CompiledPrompt:
+        compiled = self._learning.get(request_type)
+        if compiled is None:
+            raise ValueError("Invalid request type")
+        return compiled
+
+    def token_report(self) -> dict:
+        """
+        고정 프롬프트별 추정 토큰 수 (프롬프트 비용 점검용)
+        """
+        report = {p.key: p.tokens for p in self._chat.values()}
+        report.update({p.key: p.tokens for p in self._learning.values()})
+        report[self.feedback_system.key] = self.feedback_system.tokens
+        return report
+
+
+# 모듈 로드(앱 시작) 시 1회 컴파일
+prompt_registry = PromptRegistry()
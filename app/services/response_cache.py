@@ -0,0 +1,105 @@
+# ------------------------------------------------------------
+# 업스트림 응답 캐시 (LRU + TTL)
+# - 키: (모델 URL, 메시지 목록)의 정규화 JSON → sha256
+# - 크기 초과 시 가장 오래 안 쓴 항목부터, TTL 지나면 조회 시점에 제거
+# - 엔드포인트별 on/off (chat은 temperature로 출력이 매번 달라 기본 off)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+# ===================== 튜닝 가능한 설정 =====================
+
+CACHE_MAX_ENTRIES = int(os.getenv("CLOVA_CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL_SEC = float(os.getenv("CLOVA_CACHE_TTL", "3600"))
+
+# 엔드포인트별 캐시 사용 여부
+CACHE_ENDPOINTS: Dict[str, bool] = {
+    "feedback": os.getenv("CLOVA_CACHE_FEEDBACK", "1") == "1",
+    "learning": os.getenv("CLOVA_CACHE_LEARNING", "0") == "1",  # 랜덤 항목이므로 기본 off
+    "chat": os.getenv("CLOVA_CACHE_CHAT", "0") == "1",
+}
+
+# =============================================================
+
+
+def canonical_key(url: str, messages: list[dict]) -> str:
+    """
+    메시지 목록을 키 순서/공백과 무관한 JSON으로 직렬화해 해시
+    """
+    raw = json.dumps(
+        {"url": url, "messages": messages},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    크기/TTL 제한 LRU 캐시
+    """
+
+    def __init__(self, max_entries: int, ttl_sec: float):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> str | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._data[key] = (time.monotonic() + self.ttl_sec, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_sec": self.ttl_sec,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "endpoints": dict(CACHE_ENDPOINTS),
+        }
+
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_TTL_SEC)
+
+
+def enabled_for(endpoint: str | None) -> bool:
+    """
+    엔드포인트별 캐시 사용 여부 (모르는 엔드포인트는 off)
+    """
+    return CACHE_MAX_ENTRIES > 0 and CACHE_ENDPOINTS.get(endpoint or "", False)
@@ -0,0 +1,85 @@
+# ------------------------------------------------------------
+# 동일 업스트림 호출 병합 (single-flight)
+# - 같은 키(정규화 메시지 해시)의 호출이 진행 중이면 새로 보내지 않고 그 결과를 공유
+# - 예외는 기다리던 모든 호출자에게 그대로 전달
+# - 호출자 하나가 취소돼도 공유 호출은 계속, 기다리는 호출자가 모두 취소되면 공유 호출도 취소
+# - 엔드포인트별 on/off (learning은 매번 다른 랜덤 항목이 필요하므로 기본 off)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+# ===================== 튜닝 가능한 설정 =====================
+
+COALESCE_ENDPOINTS: Dict[str, bool] = {
+    "feedback": os.getenv("CLOVA_COALESCE_FEEDBACK", "1") == "1",
+    "chat": os.getenv("CLOVA_COALESCE_CHAT", "1") == "1",
+    "learning": os.getenv("CLOVA_COALESCE_LEARNING", "0") == "1",
+}
+
+# =============================================================
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.leaders = 0     # 실제 업스트림으로 나간 호출 수
+        self.coalesced = 0   # 진행 중 호출에 합류한 호출 수
+        self.cancelled = 0   # 모든 호출자가 떠나 취소된 공유 호출 수
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(fn())
+            flight = _Flight(task)
+            self._flights[key] = flight
+            task.add_done_callback(lambda _t, k=key, f=flight: self._forget(k, f))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                self.cancelled += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # 아무도 기다리지 않는 예외는 "never retrieved" 경고가 나지 않도록 소비
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "endpoints": dict(COALESCE_ENDPOINTS),
+        }
+
+
+single_flight = SingleFlight()
+
+
+def enabled_for(endpoint: str | None) -> bool:
+    return COALESCE_ENDPOINTS.get(endpoint or "", False)
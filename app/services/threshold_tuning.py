@@ -0,0 +1,308 @@
+# ------------------------------------------------------------
+# 임계치 튜닝용 일괄 재판정 엔진 (오프라인)
+# - analysis_log 기록을 열 단위 배열로 읽고, feedback_logic의 판정 규칙
+#   (_speed_from_metrics, _gaps_from_metrics, decide_issue)을 여러 임계치 조합에 대해 한꺼번에 재평가
+# - 조합마다 이슈 분포와 현재 임계치 대비 변화(이슈가 바뀐 비율) 보고
+# - numpy가 있으면 열 연산으로 벡터화, 부분 판정(정확도/속도/공백)은 같은 부분 임계치끼리 재사용
+#   (numpy는 서비스 이미지에 없는 선택 의존성: pip install -r requirements-tools.txt, 없으면 순수 Python 경로)
+#
+# 실행:
+#   python -m app.services.threshold_tuning analysis.log \
+#       --grid WER_THRESHOLD=0.15,0.2,0.25 --grid ABS_FAST_WPS=1.7:2.1:0.1 --top 20
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from app.services import feedback_logic as fl
+from app.services.analysis_log import ISSUES, load_columns
+
+try:
+    import numpy as _np  # 선택 의존성(requirements-tools.txt): 벡터화 재판정
+except ImportError:  # pragma: no cover
+    _np = None
+
+ACCURACY_PARAMS = ("WER_THRESHOLD",)
+SPEED_PARAMS = (
+    "ABS_FAST_WPS", "ABS_FAST_WPS_ART", "ABS_SLOW_WPS", "ABS_SLOW_MIN_SPEECH_MS",
+    "EXTREME_FAST_MAX_TOTAL_MS", "EXTREME_FAST_MIN_WORDS",
+)
+GAPS_PARAMS = ("PAUSE_RATIO_THRESHOLD", "LONGEST_PAUSE_MS_THRESHOLD")
+PARAMS = ACCURACY_PARAMS + SPEED_PARAMS + GAPS_PARAMS
+
+# 기록된 wer는 소수 셋째 자리 반올림값 → 임계치와의 차이가 이 폭 안이면 대소를 알 수 없음
+WER_ROUNDING_BAND = 0.0005 + 1e-9
+
+ACCURACY_CODE = ISSUES.index("accuracy")
+assert ACCURACY_CODE == 0  # _issues의 곱셈 선택이 이 순서에 의존
+
+
+def current_thresholds() -> Dict[str, float]:
+    return {name: getattr(fl, name) for name in PARAMS}
+
+
+@dataclass
+class Columns:
+    """
+    재판정에 쓰는 열 (값은 응답 dict와 같은 float로 복원)
+    """
+    n: int
+    wer: object
+    total_ms: object
+    speech_ms: object
+    pause_ms: object
+    longest_pause_ms: object
+    n_words: object
+    wps_total: object
+    wps_art: object
+    logged_issue: object
+    logged_accuracy_ok: object
+
+    @classmethod
+    def from_log(cls, path: str) -> "Columns":
+        raw = load_columns(path)
+        if _np is not None:
+            f64 = lambda name: raw[name].astype(_np.float64)  # noqa: E731
+            return cls(
+                n=len(raw["issue"]),
+                wer=f64("wer_milli") / 1000.0,
+                total_ms=f64("total_ms"),
+                speech_ms=f64("speech_ms"),
+                pause_ms=f64("pause_ms"),
+                longest_pause_ms=f64("longest_pause_ms"),
+                n_words=f64("n_words"),
+                wps_total=f64("wps_total_c") / 100.0,
+                wps_art=f64("wps_art_c") / 100.0,
+                logged_issue=raw["issue"].astype(_np.uint8),
+                logged_accuracy_ok=raw["accuracy_ok"].astype(bool),
+            )
+        return cls(
+            n=len(raw["issue"]),
+            wer=[v / 1000.0 for v in raw["wer_milli"]],
+            total_ms=list(raw["total_ms"]),
+            speech_ms=list(raw["speech_ms"]),
+            pause_ms=list(raw["pause_ms"]),
+            longest_pause_ms=list(raw["longest_pause_ms"]),
+            n_words=list(raw["n_words"]),
+            wps_total=[v / 100.0 for v in raw["wps_total_c"]],
+            wps_art=[v / 100.0 for v in raw["wps_art_c"]],
+            logged_issue=list(raw["issue"]),
+            logged_accuracy_ok=[bool(v) for v in raw["accuracy_ok"]],
+        )
+
+
+# -------------------- 부분 판정 (feedback_logic 규칙과 동일) --------------------
+
+def _accuracy_ok(c: Columns, p: Dict[str, float]):
+    """
+    wer <= WER_THRESHOLD. 현재 임계치에서 반올림 폭 안에 있는 기록은 당시 판정(accuracy_ok)을 그대로 사용
+    (판정은 반올림 전 WER로 했으므로 반올림값으로 다시 비교하면 어긋날 수 있음)
+    """
+    threshold = p["WER_THRESHOLD"]
+    use_logged = threshold == fl.WER_THRESHOLD
+    if _np is not None:
+        acc = c.wer <= threshold
+        if use_logged:
+            band = _np.abs(c.wer - threshold) <= WER_ROUNDING_BAND
+            acc = _np.where(band, c.logged_accuracy_ok, acc)
+        return acc
+    return [
+        logged if use_logged and abs(w - threshold) <= WER_ROUNDING_BAND else w <= threshold
+        for w, logged in zip(c.wer, c.logged_accuracy_ok)
+    ]
+
+
+def _speed(c: Columns, p: Dict[str, float]):
+    """
+    (fast, slow) 마스크. _speed_from_metrics와 같은 우선순위 (fast가 먼저)
+    """
+    if _np is not None:
+        fast = (
+            ((c.total_ms < p["EXTREME_FAST_MAX_TOTAL_MS"]) & (c.n_words >= p["EXTREME_FAST_MIN_WORDS"]))
+            | (c.wps_total >= p["ABS_FAST_WPS"])
+            | (c.wps_art >= p["ABS_FAST_WPS_ART"])
+        )
+        slow = ~fast & (c.wps_total <= p["ABS_SLOW_WPS"]) & (c.speech_ms >= p["ABS_SLOW_MIN_SPEECH_MS"])
+        return fast, slow
+    fast, slow = [], []
+    for total, words, wt, wa, speech in zip(c.total_ms, c.n_words, c.wps_total, c.wps_art, c.speech_ms):
+        f = ((total < p["EXTREME_FAST_MAX_TOTAL_MS"] and words >= p["EXTREME_FAST_MIN_WORDS"])
+             or wt >= p["ABS_FAST_WPS"] or wa >= p["ABS_FAST_WPS_ART"])
+        fast.append(f)
+        slow.append(not f and wt <= p["ABS_SLOW_WPS"] and speech >= p["ABS_SLOW_MIN_SPEECH_MS"])
+    return fast, slow
+
+
+def _gaps(c: Columns, p: Dict[str, float]):
+    if _np is not None:
+        total = c.total_ms
+        with _np.errstate(divide="ignore", invalid="ignore"):
+            ratio = _np.where(total > 0, c.pause_ms / _np.where(total > 0, total, 1.0), 0.0)
+        return (total > 0) & (
+            (ratio >= p["PAUSE_RATIO_THRESHOLD"]) | (c.longest_pause_ms >= p["LONGEST_PAUSE_MS_THRESHOLD"])
+        )
+    return [
+        total > 0 and (pause / total >= p["PAUSE_RATIO_THRESHOLD"] or longest >= p["LONGEST_PAUSE_MS_THRESHOLD"])
+        for total, pause, longest in zip(c.total_ms, c.pause_ms, c.longest_pause_ms)
+    ]
+
+
+def _speed_gap_codes(speed, gaps):
+    """
+    정확도 통과 시의 이슈 코드 (decide_issue의 2~4순위: speed_fast → speed_slow → gaps → good)
+    """
+    fast, slow = speed
+    if _np is not None:
+        codes = _np.where(gaps, _np.uint8(ISSUES.index("gaps")), _np.uint8(ISSUES.index("good")))
+        codes[slow] = ISSUES.index("speed_slow")
+        codes[fast] = ISSUES.index("speed_fast")
+        return codes
+    return [
+        ISSUES.index(fl.decide_issue(True, "fast" if f else "slow" if s else "ok", g))
+        for f, s, g in zip(fast, slow, gaps)
+    ]
+
+
+def _issues(acc, speed_gap_codes):
+    """
+    최종 이슈 코드: 정확도 실패면 accuracy(코드 0), 아니면 속도/공백 코드
+    """
+    if _np is not None:
+        return speed_gap_codes * acc  # ACCURACY_CODE == 0 이라 곱셈 한 번으로 선택
+    return [code if ok else ACCURACY_CODE for ok, code in zip(acc, speed_gap_codes)]
+
+
+def _counts(codes) -> List[int]:
+    if _np is not None:
+        return [int(_np.count_nonzero(codes == k)) for k in range(len(ISSUES))]
+    counts = [0] * len(ISSUES)
+    for code in codes:
+        counts[code] += 1
+    return counts
+
+
+def _changed(codes, base) -> int:
+    if _np is not None:
+        return int(_np.count_nonzero(codes != base))
+    return sum(1 for a, b in zip(codes, base) if a != b)
+
+
+# -------------------- 그리드 평가 --------------------
+
+def expand_grid(grid: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """
+    {파라미터: 후보 목록} → 조합 목록 (지정하지 않은 파라미터는 현재 값)
+    """
+    unknown = set(grid) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"알 수 없는 임계치: {', '.join(sorted(unknown))}")
+    base = current_thresholds()
+    names = list(grid)
+    return [dict(base, **dict(zip(names, values))) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def evaluate(columns: Columns, combos: Iterable[Dict[str, float]]) -> List[dict]:
+    """
+    조합별 이슈 분포와 현재 임계치 대비 변화 계산
+    - 정확도/속도/공백 부분 판정은 해당 부분 임계치가 같은 조합끼리 공유
+    """
+    cache: Dict[Tuple, object] = {}
+
+    def cached(key: Tuple, fn):
+        if key not in cache:
+            cache[key] = fn()
+        return cache[key]
+
+    def issues_for(p: Dict[str, float]):
+        acc_key = ("acc",) + tuple(p[n] for n in ACCURACY_PARAMS)
+        speed_key = ("speed",) + tuple(p[n] for n in SPEED_PARAMS)
+        gaps_key = ("gaps",) + tuple(p[n] for n in GAPS_PARAMS)
+        acc = cached(acc_key, lambda: _accuracy_ok(columns, p))
+        speed_gap = cached(speed_key + gaps_key, lambda: _speed_gap_codes(
+            cached(speed_key, lambda: _speed(columns, p)),
+            cached(gaps_key, lambda: _gaps(columns, p)),
+        ))
+        return _issues(acc, speed_gap)
+
+    base_codes = issues_for(current_thresholds())
+    base_counts = _counts(base_codes)
+    n = max(1, columns.n)
+    results = []
+    for p in combos:
+        codes = issues_for(p)
+        counts = _counts(codes)
+        results.append({
+            "thresholds": {k: p[k] for k in PARAMS},
+            "counts": dict(zip(ISSUES, counts)),
+            "share": {issue: round(c / n, 4) for issue, c in zip(ISSUES, counts)},
+            "delta": {issue: round((c - b) / n, 4) for issue, c, b in zip(ISSUES, counts, base_counts)},
+            "changed": round(_changed(codes, base_codes) / n, 4),
+        })
+    return results
+
+
+def logged_distribution(columns: Columns) -> Dict[str, int]:
+    return dict(zip(ISSUES, _counts(columns.logged_issue)))
+
+
+# -------------------- CLI --------------------
+
+def _parse_values(spec: str) -> List[float]:
+    """
+    "0.1,0.2,0.3" 또는 "start:stop:step"(stop 포함)
+    """
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 10) for i in range(max(0, count))]
+    return [float(x) for x in spec.split(",") if x]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-score logged feedback analyses under threshold grids")
+    parser.add_argument("log", help="analysis_log 파일 경로")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=VALUES",
+                        help="임계치 후보 (예: WER_THRESHOLD=0.15,0.2 또는 ABS_FAST_WPS=1.7:2.1:0.1)")
+    parser.add_argument("--sort", default="changed", help="정렬 기준: changed 또는 이슈 이름(비율)")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="전체 결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    grid: Dict[str, List[float]] = {}
+    for item in args.grid:
+        name, _, values = item.partition("=")
+        grid[name.strip()] = _parse_values(values)
+
+    t0 = time.perf_counter()
+    columns = Columns.from_log(args.log)
+    t1 = time.perf_counter()
+    combos = expand_grid(grid)
+    results = evaluate(columns, combos)
+    t2 = time.perf_counter()
+
+    if args.json:
+        json.dump({"records": columns.n, "logged": logged_distribution(columns), "results": results},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+
+    print(f"records={columns.n} combos={len(combos)} load={t1 - t0:.2f}s eval={t2 - t1:.2f}s "
+          f"numpy={_np is not None}")
+    print("logged:", logged_distribution(columns))
+    key = (lambda r: r["changed"]) if args.sort == "changed" else (lambda r: r["share"][args.sort])
+    varied = list(grid)
+    widths = [max(12, len(n)) for n in varied]
+    print("  ".join(f"{n:>{w}}" for n, w in zip(varied, widths)) + "".join(f"{i:>18}" for i in ISSUES) + f"{'changed':>9}")
+    for r in sorted(results, key=key, reverse=True)[: args.top]:
+        cells = "".join(f"{r['share'][i]:>9.2%} ({r['delta'][i]:+.1%})" for i in ISSUES)
+        print("  ".join(f"{r['thresholds'][n]:>{w}g}" for n, w in zip(varied, widths)) + cells + f"{r['changed']:>9.2%}")
+
+
+if __name__ == "__main__":
+    main()
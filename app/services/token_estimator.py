@@ -0,0 +1,35 @@
+# ------------------------------------------------------------
+# 로컬 토큰 수 추정 (토크나이저 호출 없이 O(n) 문자 분류)
+# - 한글 음절: 음절 2개당 약 1토큰 (HCX 계열은 한국어 압축률이 높음)
+# - 영문/숫자: 4글자당 약 1토큰
+# - 그 밖의 문자(구두점, 기호 등): 1글자당 1토큰
+# - 메시지마다 역할/구분자 오버헤드를 더함
+# 정확한 값이 아니라 예산 판단용 상한에 가까운 근사치
+# ------------------------------------------------------------
+
+from __future__ import annotations
+from typing import Iterable
+
+MESSAGE_OVERHEAD_TOKENS = 4  # 역할 태그/구분자
+
+
+def estimate_tokens(text: str) -> int:
+    hangul = 0
+    alnum = 0
+    other = 0
+    for ch in text:
+        if "가" <= ch <= "힣":
+            hangul += 1
+        elif ch.isascii() and ch.isalnum():
+            alnum += 1
+        elif not ch.isspace():
+            other += 1
+    return (hangul + 1) // 2 + (alnum + 3) // 4 + other
+
+
+def estimate_message_tokens(message: dict) -> int:
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_messages_tokens(messages: Iterable[dict]) -> int:
+    return sum(estimate_message_tokens(m) for m in messages)
@@ -0,0 +1,310 @@
+# ------------------------------------------------------------
+# 요청 단위 경량 트레이싱
+# - 라우터/서비스의 단계별 구간(span)을 요청마다 모아
+#   Server-Timing 응답 헤더로 내보냄 (브라우저 개발자 도구/로그에서 바로 확인)
+# - 선택: 샘플링한 요청을 로컬 파일로 내보냄 (JSONL 또는 OTLP/JSON 파일)
+# - 요청 밖(백그라운드 보충 등)이나 tracing off일 때 span은 contextvar 조회 1회뿐
+# - 스트리밍 응답은 헤더 전송 시점까지의 구간만 Server-Timing에 포함 (파일에는 전체)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import json
+import os
+import random
+import secrets
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from app.services.metrics import STAGE_LATENCY
+
+# ===================== 튜닝 가능한 설정 =====================
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")                          # "" | "jsonl" | "otlp"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))      # 파일로 내보낼 요청 비율
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "2000"))              # 이보다 느린 요청은 항상 내보냄
+TRACE_EXPORT_BUFFER = int(os.getenv("TRACE_EXPORT_BUFFER", "64"))      # 모아서 쓸 트레이스 수
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "talkie-ai")
+
+# =============================================================
+
+# (span_id, parent_id, name, start, end, attrs) — start/end는 perf_counter 초
+SpanRecord = Tuple[str, str, str, float, float, Optional[Dict]]
+
+
+class Trace:
+    __slots__ = ("trace_id", "root_id", "name", "wall_start_ns", "perf_start", "spans", "attrs")
+
+    def __init__(self, name: str):
+        self.trace_id = secrets.token_hex(16)
+        self.root_id = secrets.token_hex(8)
+        self.name = name
+        self.wall_start_ns = time.time_ns()
+        self.perf_start = time.perf_counter()
+        self.spans: List[SpanRecord] = []
+        self.attrs: Dict[str, object] = {}
+
+    def _wall_ns(self, perf: float) -> int:
+        return self.wall_start_ns + int((perf - self.perf_start) * 1e9)
+
+    def server_timing(self, now: float) -> str:
+        """
+        이름별 합계(ms)를 처음 시작한 순서로 + 전체(app)
+        """
+        totals: Dict[str, float] = {}
+        for _sid, _pid, name, start, end, _attrs in self.spans:
+            totals[name] = totals.get(name, 0.0) + (end - start)
+        parts = [f"{name};dur={1000 * d:.2f}" for name, d in totals.items()]
+        parts.append(f"app;dur={1000 * (now - self.perf_start):.2f}")
+        return ", ".join(parts)
+
+    def to_jsonl(self, end: float) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start_unix_ns": self.wall_start_ns,
+            "duration_ms": round(1000 * (end - self.perf_start), 3),
+            "attrs": self.attrs,
+            "spans": [
+                {
+                    "span_id": sid,
+                    "parent_id": pid,
+                    "name": name,
+                    "offset_ms": round(1000 * (start - self.perf_start), 3),
+                    "duration_ms": round(1000 * (stop - start), 3),
+                    **({"attrs": attrs} if attrs else {}),
+                }
+                for sid, pid, name, start, stop, attrs in self.spans
+            ],
+        }
+
+    def to_otlp(self, end: float) -> dict:
+        """
+        OTLP/JSON (ExportTraceServiceRequest) 한 건 — 파일 익스포터/컬렉터 filelog 수집용
+        """
+        def attributes(attrs: Optional[Dict]) -> List[dict]:
+            out = []
+            for k, v in (attrs or {}).items():
+                if isinstance(v, bool):
+                    out.append({"key": k, "value": {"boolValue": v}})
+                elif isinstance(v, int):
+                    out.append({"key": k, "value": {"intValue": str(v)}})
+                elif isinstance(v, float):
+                    out.append({"key": k, "value": {"doubleValue": v}})
+                else:
+                    out.append({"key": k, "value": {"stringValue": str(v)}})
+            return out
+
+        root = {
+            "traceId": self.trace_id,
+            "spanId": self.root_id,
+            "name": self.name,
+            "kind": 2,  # SERVER
+            "startTimeUnixNano": str(self.wall_start_ns),
+            "endTimeUnixNano": str(self._wall_ns(end)),
+            "attributes": attributes(self.attrs),
+        }
+        children = [
+            {
+                "traceId": self.trace_id,
+                "spanId": sid,
+                "parentSpanId": pid,
+                "name": name,
+                "kind": 1,  # INTERNAL
+                "startTimeUnixNano": str(self._wall_ns(start)),
+                "endTimeUnixNano": str(self._wall_ns(stop)),
+                "attributes": attributes(attrs),
+            }
+            for sid, pid, name, start, stop, attrs in self.spans
+        ]
+        return {"resourceSpans": [{
+            "resource": {"attributes": attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": "app.services.tracing"}, "spans": [root, *children]}],
+        }]}
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_parent: ContextVar[str] = ContextVar("trace_parent", default="")
+
+
+class _Span:
+    __slots__ = ("trace", "name", "attrs", "span_id", "parent_id", "start", "token")
+
+    def __init__(self, trace: Trace, name: str, attrs: Optional[Dict]):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, key: str, value) -> None:
+        if self.attrs is None:
+            self.attrs = {}
+        self.attrs[key] = value
+
+    def __enter__(self) -> "_Span":
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = _parent.get() or self.trace.root_id
+        self.token = _parent.set(self.span_id)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.perf_counter()
+        _parent.reset(self.token)
+        self.trace.spans.append((self.span_id, self.parent_id, self.name, self.start, end, self.attrs))
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, key: str, value) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attrs):
+    """
+    현재 요청 트레이스에 구간 추가 (트레이스가 없으면 아무것도 하지 않음)
+        with span("wer"):
+            ...
+    """
+    trace = _trace.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, attrs or None)
+
+
+def record_span(name: str, start: float, **attrs) -> None:
+    """
+    이미 시작된 구간(start = perf_counter 값)을 지금까지로 기록 — with 블록으로 감싸기 어려운 곳용
+    (예: 스트리밍 응답의 헤더 도착까지)
+    """
+    trace = _trace.get()
+    if trace is None:
+        return
+    parent = _parent.get() or trace.root_id
+    trace.spans.append((secrets.token_hex(8), parent, name, start, time.perf_counter(), attrs or None))
+
+
+class stage:
+    """
+    단계 지연 지표(STAGE_LATENCY) 기록 + 같은 이름의 span (시간 측정은 한 번)
+    """
+    __slots__ = ("name", "start", "span")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "stage":
+        trace = _trace.get()
+        self.span = _Span(trace, self.name, None).__enter__() if trace is not None else None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        STAGE_LATENCY.observe(time.perf_counter() - self.start, stage=self.name)
+        if self.span is not None:
+            self.span.__exit__()
+
+
+# -------------------- 내보내기 --------------------
+
+class _FileExporter:
+    def __init__(self, path: str, fmt: str, buffer: int):
+        self.path = path
+        self.fmt = fmt
+        self.buffer = max(1, buffer)
+        self._lines: List[str] = []
+        self.exported = 0
+        self.errors = 0
+
+    def export(self, trace: Trace, end: float) -> None:
+        body = trace.to_otlp(end) if self.fmt == "otlp" else trace.to_jsonl(end)
+        self._lines.append(json.dumps(body, ensure_ascii=False, separators=(",", ":")))
+        if len(self._lines) >= self.buffer:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._lines:
+            return
+        data = "\n".join(self._lines) + "\n"
+        n = len(self._lines)
+        self._lines.clear()
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+            self.exported += n
+        except OSError:
+            self.errors += n
+
+
+_exporter: Optional[_FileExporter] = (
+    _FileExporter(TRACE_EXPORT_PATH, TRACE_EXPORT, TRACE_EXPORT_BUFFER)
+    if TRACING_ENABLED and TRACE_EXPORT in ("jsonl", "otlp") else None
+)
+
+
+def _finish(trace: Trace, end: float, sampled: bool) -> None:
+    if _exporter is None:
+        return
+    if sampled or 1000 * (end - trace.perf_start) >= TRACE_SLOW_MS:
+        _exporter.export(trace, end)
+
+
+def flush() -> None:
+    if _exporter is not None:
+        _exporter.flush()
+
+
+def tracing_stats() -> dict:
+    return {
+        "enabled": TRACING_ENABLED,
+        "export": TRACE_EXPORT or None,
+        "sample_rate": TRACE_SAMPLE_RATE,
+        "slow_ms": TRACE_SLOW_MS,
+        "exported": _exporter.exported if _exporter else 0,
+        "export_errors": _exporter.errors if _exporter else 0,
+    }
+
+
+class TracingMiddleware:
+    """
+    HTTP 요청마다 트레이스를 시작하고 Server-Timing 헤더 추가, 끝나면 (샘플링 시) 파일로 내보냄
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not TRACING_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(f'{scope.get("method", "")} {scope.get("path", "")}')
+        token = _trace.set(trace)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing(time.perf_counter()).encode("latin-1")))
+                message = {**message, "headers": headers}
+                trace.attrs["http.status_code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _trace.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                trace.name = f'{scope.get("method", "")} {route}'
+            _finish(trace, time.perf_counter(), random.random() < TRACE_SAMPLE_RATE)
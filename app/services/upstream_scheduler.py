@@ -0,0 +1,196 @@
+# ------------------------------------------------------------
+# 업스트림(Clova) 호출 스케줄러
+# - 모델별 토큰 버킷으로 초당 호출 수 제한 (HCX-DASH-002, HCX-003)
+# - 토큰이 없으면 제한된 길이의 대기열에서 요청별 마감 시간까지 대기
+# - 429 응답은 Retry-After(없으면 지수 백오프)에 지터를 더해 재시도하고,
+#   그동안 같은 모델의 다른 요청도 잠시 멈춤
+# - 대기열 길이/대기 시간 지표 제공 (/stats, /metrics의 talkie_upstream_queue_*)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict
+
+import httpx
+
+from app.services.metrics import UPSTREAM_QUEUE_DEPTH, UPSTREAM_QUEUE_WAIT
+
+# ===================== 튜닝 가능한 설정 =====================
+
+# 모델별 초당 호출 수(rate)와 순간 허용량(burst). rate ≤ 0 이면 제한 없음
+MODEL_RATE_LIMITS: Dict[str, tuple[float, float]] = {
+    "HCX-DASH-002": (
+        float(os.getenv("CLOVA_RATE_HCX_DASH_002", "20")),
+        float(os.getenv("CLOVA_BURST_HCX_DASH_002", "20")),
+    ),
+    "HCX-003": (
+        float(os.getenv("CLOVA_RATE_HCX_003", "10")),
+        float(os.getenv("CLOVA_BURST_HCX_003", "10")),
+    ),
+}
+DEFAULT_RATE_LIMIT = (0.0, 0.0)  # 목록에 없는 모델은 제한 없음
+
+# 워커 프로세스 수 (app.server가 설정). 위 한도는 계정 단위이므로 워커끼리 나눠 가짐
+WORKER_SHARE = max(1, int(os.getenv("SERVER_WORKER_COUNT", "1")))
+
+QUEUE_MAX_WAITERS = int(os.getenv("CLOVA_QUEUE_MAX", "200"))        # 모델별 대기열 최대 길이
+SCHEDULE_DEADLINE_SEC = float(os.getenv("CLOVA_QUEUE_DEADLINE", "3.0"))  # 대기 + 429 재시도 총 마감(s)
+RETRY_MAX = int(os.getenv("CLOVA_RETRY_MAX", "3"))                  # 429 재시도 횟수
+RETRY_BASE_SEC = float(os.getenv("CLOVA_RETRY_BASE", "0.2"))        # Retry-After 없을 때 백오프 기본값(s)
+RETRY_JITTER = float(os.getenv("CLOVA_RETRY_JITTER", "0.5"))        # 지연에 더할 무작위 비율
+
+# =============================================================
+
+
+class UpstreamBusyError(Exception):
+    """
+    대기열 포화, 마감 시간 초과, 429 재시도 소진 시 발생 (라우터에서 503으로 변환)
+    """
+
+
+class TokenBucket:
+    def __init__(self, model: str, rate: float, burst: float):
+        self.model = model
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # 429 이후 재개 시각
+        self._lock = asyncio.Lock()  # 대기 순서(FIFO) 보장
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.throttled = 0
+        self.wait_samples = 0
+        self.wait_total_sec = 0.0
+        self.wait_max_sec = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, deadline: float) -> None:
+        if self.rate <= 0 and self.blocked_until <= time.monotonic():
+            self.acquired += 1
+            return
+        if self.waiting >= QUEUE_MAX_WAITERS:
+            self.rejected += 1
+            raise UpstreamBusyError(f"{self.model} 대기열이 가득 찼습니다.")
+
+        start = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        UPSTREAM_QUEUE_DEPTH.inc(model=self.model)
+        try:
+            # 앞선 대기자가 오래 잡고 있어도 마감 시간 이후까지 락을 기다리지 않음
+            try:
+                await asyncio.wait_for(self._lock.acquire(), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise UpstreamBusyError(f"{self.model} 호출 대기 시간이 초과되었습니다.") from None
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now > deadline:
+                        self.timeouts += 1
+                        raise UpstreamBusyError(f"{self.model} 호출 대기 시간이 초과되었습니다.")
+                    wait = self.blocked_until - now
+                    if wait <= 0:
+                        if self.rate <= 0:
+                            break
+                        self._refill(now)
+                        if self.tokens >= 1:
+                            self.tokens -= 1
+                            break
+                        wait = (1 - self.tokens) / self.rate
+                    if now + wait > deadline:
+                        self.timeouts += 1
+                        raise UpstreamBusyError(f"{self.model} 호출 대기 시간이 초과되었습니다.")
+                    await asyncio.sleep(wait)
+            finally:
+                self._lock.release()
+            self.acquired += 1
+        finally:
+            self.waiting -= 1
+            UPSTREAM_QUEUE_DEPTH.dec(model=self.model)
+            waited = time.monotonic() - start
+            UPSTREAM_QUEUE_WAIT.observe(waited, model=self.model)
+            self.wait_samples += 1
+            self.wait_total_sec += waited
+            self.wait_max_sec = max(self.wait_max_sec, waited)
+
+    def pause(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "throttled_429": self.throttled,
+            "wait_avg_ms": round(1000 * self.wait_total_sec / self.wait_samples, 1) if self.wait_samples else 0.0,
+            "wait_max_ms": round(1000 * self.wait_max_sec, 1),
+        }
+
+
+def _retry_after_sec(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class UpstreamScheduler:
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        for model in MODEL_RATE_LIMITS:
+            self.bucket(model)
+
+    def bucket(self, model: str) -> TokenBucket:
+        b = self._buckets.get(model)
+        if b is None:
+            rate, burst = MODEL_RATE_LIMITS.get(model, DEFAULT_RATE_LIMIT)
+            b = self._buckets[model] = TokenBucket(model, rate / WORKER_SHARE, burst / WORKER_SHARE)
+        return b
+
+    def deadline(self) -> float:
+        return time.monotonic() + SCHEDULE_DEADLINE_SEC
+
+    async def acquire(self, model: str, deadline: float) -> None:
+        await self.bucket(model).acquire(deadline)
+
+    def on_throttled(self, model: str, response: httpx.Response, attempt: int) -> float:
+        """
+        429 수신 시 재시도까지 기다릴 시간을 정하고 해당 모델 버킷을 그동안 멈춤
+        """
+        b = self.bucket(model)
+        b.throttled += 1
+        base = _retry_after_sec(response)
+        if base is None:
+            base = RETRY_BASE_SEC * (2 ** attempt)
+        delay = base * (1 + random.uniform(0, RETRY_JITTER))
+        b.pause(delay)
+        return delay
+
+    def stats(self) -> dict:
+        return {model: b.stats() for model, b in self._buckets.items()}
+
+
+scheduler = UpstreamScheduler()
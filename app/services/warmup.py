@@ -0,0 +1,171 @@
+# ------------------------------------------------------------
+# 시작 시 워밍업 (배포/스케일아웃 직후 첫 요청 지연 완화)
+# - 업스트림 커넥션 미리 열기 (TLS 세션 준비)
+# - CPU 경로 한 번씩 실행: 피드백 분석(re 패턴, WordTable), pydantic 검증/직렬화,
+#   학습/대화/피드백 프롬프트 구성
+# - 끝나면 ready → /ready가 200 (그 전과 종료 중에는 503, 로드밸런서 헬스체크용)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import os
+import time
+
+from app.constants.topics import Topic
+from app.schemas.chat import ChatRequest, ChatResponse
+from app.schemas.feedback import FeedbackAnalysis, FeedbackRequest, FeedbackResponse
+from app.services import clova_client
+from app.services.feedback_logic import WordTable, analyze_feedback_with_segments
+from app.services.feedback_templates import template_feedback
+from app.services.prompt_builder import (
+    build_chat_prompt_with_stats, build_feedback_messages, build_learning_prompts,
+)
+
+# ===================== 튜닝 가능한 설정 =====================
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))          # 미리 열 업스트림 커넥션 수
+WARMUP_CONNECT_TIMEOUT = float(os.getenv("WARMUP_CONNECT_TIMEOUT", "5"))  # 커넥션 워밍업 타임아웃(s)
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "3"))                     # CPU 경로 반복 횟수
+
+# =============================================================
+
+# 대표 입력: 짧은 드릴(리스트 형식 words)과 여러 세그먼트 문장(dict 형식 words)
+_SAMPLES = [
+    {
+        "target_text": "김치찌개 하나 주세요",
+        "result_text": "김치찌개 하나 주세요",
+        "segments": [{"start": 0, "end": 1800, "words": [[100, 600, "김치찌개"], [700, 1000, "하나"], [1100, 1600, "주세요"]]}],
+    },
+    {
+        "target_text": "내일 회의는 몇 시에 시작하나요?",
+        "result_text": "내일 회의 몇 시에 시작하나요",
+        "segments": [
+            {"start": 0, "end": 1500, "words": [
+                {"start": 50, "end": 400, "token": "내일"},
+                {"start": 500, "end": 900, "token": "회의"},
+            ]},
+            {"start": 1500, "end": 4200, "words": [
+                {"start": 1900, "end": 2100, "token": "몇"},
+                {"start": 2200, "end": 2600, "token": "시에"},
+                {"start": 3300, "end": 4000, "token": "시작하나요"},
+            ]},
+        ],
+    },
+]
+
+
+class WarmupState:
+    def __init__(self):
+        self.ready = not WARMUP_ENABLED
+        self.shutting_down = False
+        self.connections_opened = 0
+        self.connections_ms = 0.0
+        self.cpu_ms = 0.0
+        self.error: str | None = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": WARMUP_ENABLED,
+            "ready": self.ready and not self.shutting_down,
+            "shutting_down": self.shutting_down,
+            "connections_opened": self.connections_opened,
+            "connections_ms": round(self.connections_ms, 1),
+            "cpu_ms": round(self.cpu_ms, 1),
+            "error": self.error,
+        }
+
+
+state = WarmupState()
+_task: asyncio.Task | None = None
+
+
+def _warm_cpu_paths() -> None:
+    """
+    요청 경로의 로컬 단계를 대표 입력으로 실행 (결과는 버림)
+    """
+    for sample in _SAMPLES:
+        req = FeedbackRequest.model_validate(sample)
+        for segments in (WordTable.from_segments(sample["segments"], strict=True),
+                         [s.model_dump() for s in req.segments]):
+            analysis = analyze_feedback_with_segments(
+                target_text=sample["target_text"],
+                result_text=sample["result_text"],
+                user_segments=segments,
+            )
+        build_feedback_messages(
+            target_text=sample["target_text"],
+            result_text=sample["result_text"],
+            issue=analysis["issue"],
+            accuracy_ok=analysis["accuracy_ok"],
+            speed=analysis["speed"],
+            gaps=analysis["gaps"],
+            wpm_user=analysis["wpm_user"],
+        )
+        FeedbackResponse(
+            feedback_text=template_feedback(analysis["issue"], analysis["wpm_user"]),
+            analysis=FeedbackAnalysis(**analysis),
+        ).model_dump_json()
+
+    for request_type in ("word", "sentence"):
+        build_learning_prompts(request_type)
+
+    history = [
+        {"role": "assistant", "content": "안녕하세요, 무엇을 도와드릴까요?"},
+        {"role": "user", "content": "추천 메뉴가 뭐예요?"},
+    ]
+    for topic in Topic:
+        req = ChatRequest.model_validate({"topic": topic.value, "history": history, "user_input": "좋아요"})
+        _messages, stats = build_chat_prompt_with_stats(
+            topic=req.topic, history=[m.model_dump() for m in req.history], user_input=req.user_input,
+        )
+        ChatResponse(
+            ai_response="네", prompt_tokens_before=stats.tokens_before, prompt_tokens_after=stats.tokens_after,
+        ).model_dump_json()
+
+
+async def run_warmup() -> None:
+    try:
+        start = time.perf_counter()
+        state.connections_opened = await clova_client.prewarm_connections(
+            WARMUP_CONNECTIONS, WARMUP_CONNECT_TIMEOUT
+        )
+        state.connections_ms = 1000 * (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(max(1, WARMUP_ROUNDS)):
+            _warm_cpu_paths()
+            await asyncio.sleep(0)  # 워밍업 중에도 다른 요청(/, /ready 등) 처리
+        state.cpu_ms = 1000 * (time.perf_counter() - start)
+    except Exception as e:
+        # 워밍업 실패는 서비스 불가 사유가 아님 → 기록만 하고 ready
+        state.error = f"{type(e).__name__}: {e}"
+    finally:
+        state.ready = True
+
+
+async def start_warmup() -> None:
+    """
+    백그라운드로 워밍업 시작 (lifespan에서 호출, 서버는 바로 연결을 받되 /ready는 완료 후 200)
+    """
+    global _task
+    state.shutting_down = False
+    if not WARMUP_ENABLED or _task is not None:
+        return
+    _task = asyncio.create_task(run_warmup())
+
+
+async def stop_warmup() -> None:
+    """
+    종료 시작: /ready를 503으로 돌려 새 트래픽을 받지 않게 하고, 진행 중인 워밍업 취소
+    """
+    global _task
+    state.shutting_down = True
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+
+
+def is_ready() -> bool:
+    return state.ready and not state.shutting_down
@@ -0,0 +1,198 @@
+# ------------------------------------------------------------
+# feedback_logic 마이크로벤치마크 (우리가 가진 유일한 CPU 바운드 코드)
+# - analyze_feedback_with_segments의 단계별 시간 측정:
+#     pydantic : Segment 검증 + model_dump (배치 요청 경로의 입력 변환)
+#     ingest   : WordTable.from_segments(segments, strict=True) (단건 요청 경로의 입력 변환)
+#     wer      : _wer(target, result)
+#     merge    : _merge_segments(segments)
+#     metrics  : _metrics_from_segments(segments)  (테이블 구성 포함)
+#     table    : _metrics_from_segments(WordTable)  (이미 구성된 테이블)
+#     decide   : 속도/공백/이슈 판정
+#     analyze  : 전체
+# - 입력 크기는 segment_gen.SIZES (3단어 드릴 ~ 250단어 낭독)
+# - 기준선(JSON) 저장/비교로 회귀 확인
+# - ingest(빠른 경로)와 pydantic 스키마가 경계 입력에서 같은 허용/거절을 내는지 확인 (--check, --compare)
+#
+# 실행:
+#   python -m benchmarks.bench_feedback_logic                  # 측정 결과 출력
+#   python -m benchmarks.bench_feedback_logic --save           # 기준선 저장
+#   python -m benchmarks.bench_feedback_logic --compare        # 기준선 대비 비교 (느려지면 exit 1)
+#   python -m benchmarks.bench_feedback_logic --check          # 검증 규칙 일치만 확인 (다르면 exit 1)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+from pydantic import ValidationError
+
+from app.schemas.feedback import FeedbackRequest, Segment
+from app.services import feedback_logic as fl
+from benchmarks.segment_gen import SIZES, make_sample
+
+BASELINE_PATH = Path(__file__).with_name("baselines") / "feedback_logic.json"
+
+# 검증 규칙 비교용 경계 값 (pydantic lax int 규칙: 정수 문자열/소수부 0인 실수만 허용)
+PARITY_VALUES = (
+    0, 1.0, 0.5, True, float("nan"), None, "a",
+    "10", " 10 ", "+5", "1_000", "10.0", "1.5", "10.", "1e3", " 1e3 ", "0x10",
+)
+
+
+def _stages(sample) -> Dict[str, Callable[[], object]]:
+    target, result, segments = sample.target_text, sample.result_text, sample.segments
+    m = fl._metrics_from_segments(segments)
+    table = fl.WordTable.from_segments(segments)
+    accuracy_ok = fl._wer(target, result) <= fl.WER_THRESHOLD
+    return {
+        "pydantic": lambda: [Segment.model_validate(seg).model_dump() for seg in segments],
+        "ingest": lambda: fl.WordTable.from_segments(segments, strict=True),
+        "wer": lambda: fl._wer(target, result),
+        "merge": lambda: fl._merge_segments(segments),
+        "metrics": lambda: fl._metrics_from_segments(segments),
+        "table": lambda: fl._metrics_from_segments(table),
+        "decide": lambda: fl.decide_issue(accuracy_ok, fl._speed_from_metrics(m), fl._gaps_from_metrics(m)),
+        "analyze": lambda: fl.analyze_feedback_with_segments(
+            target_text=target, result_text=result, user_segments=segments),
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int, min_time: float) -> float:
+    """
+    호출 1회당 시간(µs): 한 번에 min_time 이상 걸리도록 반복 횟수를 정하고 repeat번 측정한 최솟값
+    (최솟값이 다른 프로세스/GC 잡음에 가장 덜 흔들림)
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    runs = timer.repeat(repeat=repeat, number=number)
+    return min(runs) / number * 1e6
+
+
+def run(repeat: int, min_time: float, only: str | None = None) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for size, spec in SIZES.items():
+        if only and only not in size:
+            continue
+        sample = make_sample(spec, seed=1)
+        results[size] = {name: round(measure(fn, repeat, min_time), 2) for name, fn in _stages(sample).items()}
+    return results
+
+
+def print_table(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]] | None = None) -> None:
+    stages = list(next(iter(results.values())).keys()) if results else []
+    print(f"{'size':<24}" + "".join(f"{s:>17}" for s in stages) + "   (µs/call)")
+    for size, row in results.items():
+        cells = []
+        for s in stages:
+            cell = f"{row[s]:.2f}"
+            base = (baseline or {}).get(size, {}).get(s)
+            if base:
+                cell += f" ({row[s] / base:.2f}x)"
+            cells.append(f"{cell:>17}")
+        print(f"{size:<24}" + "".join(cells))
+
+
+def _parity_cases() -> list:
+    cases: list = [{}, None, "ab", [], [None], [{"start": 0}]]
+    for v in PARITY_VALUES:
+        cases.append([{"start": v, "end": 900}])
+        cases.append([{"start": 0, "end": 900, "words": [{"start": v, "end": 300, "token": "a"}]}])
+        if v is not None:  # [s, e, tok]의 None은 스키마 validator가 TypeError(500)로 실패 → 비교 대상 아님
+            cases.append([{"start": 0, "end": 900, "words": [[v, 300, "a"]]}])
+    for words in ("abc", {}, "", None, [], [{"start": 0, "end": 1, "token": 5}]):
+        cases.append([{"start": 0, "end": 900, "words": words}])
+    return cases
+
+
+def check_parity() -> list[str]:
+    """
+    같은 segments에 대해 FeedbackRequest(pydantic)와 WordTable.from_segments(strict=True)의
+    허용/거절, 허용 시 단어 (start, end, token)가 같은지 확인 → 다른 입력 목록
+    """
+    mismatches = []
+    for segments in _parity_cases():
+        try:
+            req = FeedbackRequest(target_text="", result_text="", segments=segments)
+            expected = [(w.start, w.end, w.token) for seg in req.segments for w in seg.words]
+        except ValidationError:
+            expected = None
+        try:
+            table = fl.WordTable.from_segments(segments, strict=True)
+            actual = list(zip(table.starts, table.ends, table.tokens))
+        except (TypeError, ValueError):
+            actual = None
+        if expected != actual:
+            mismatches.append(f"segments={segments!r}: pydantic={expected} ingest={actual}")
+    return mismatches
+
+
+def compare(results, baseline, tolerance: float, min_delta: float) -> list[str]:
+    regressions = []
+    for size, row in results.items():
+        for stage, value in row.items():
+            base = baseline.get(size, {}).get(stage)
+            if base and value > base * tolerance and value - base > min_delta:
+                regressions.append(f"{size}/{stage}: {base:.2f} → {value:.2f} µs ({value / base:.2f}x)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="feedback_logic microbenchmarks")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="측정 1회 최소 시간(s)")
+    parser.add_argument("--only", default=None, help="크기 이름 필터 (부분 일치)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="결과를 기준선으로 저장")
+    parser.add_argument("--compare", action="store_true", help="기준선 대비 회귀 확인")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="허용 배수 (기본 1.5x)")
+    parser.add_argument("--min-delta", type=float, default=2.0, help="무시할 절대 차이(µs, 측정 잡음)")
+    parser.add_argument("--check", action="store_true", help="ingest/pydantic 검증 규칙 일치만 확인")
+    args = parser.parse_args()
+
+    if args.check or args.compare:
+        mismatches = check_parity()
+        if mismatches:
+            print("검증 규칙 불일치:", *mismatches, sep="\n  ")
+            sys.exit(1)
+        print(f"검증 규칙 일치 ({len(_parity_cases())}건)")
+        if args.check:
+            return
+
+    results = run(args.repeat, args.min_time, args.only)
+    baseline = None
+    if args.compare or args.baseline.exists():
+        try:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        except FileNotFoundError:
+            print(f"기준선 파일이 없습니다: {args.baseline}", file=sys.stderr)
+            sys.exit(2)
+    print_table(results, baseline)
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "numpy": fl._np is not None,
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"기준선 저장: {args.baseline}")
+
+    if args.compare:
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print("회귀 감지:", *regressions, sep="\n  ")
+            sys.exit(1)
+        print(f"회귀 없음 (허용 {args.tolerance:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# ------------------------------------------------------------
+# 엔드투엔드 부하 테스트 (/api/learning, /api/chat, /api/feedback)
+# - 고정 동시성(closed loop)으로 요청을 보내고 처리량, p50/p95/p99, 상태 코드별 건수 출력
+# - 서버는 로컬 Clova 대역(benchmarks/mock_clova.py)을 바라보도록 띄워 둔다
+#
+# 실행:
+#   python -m benchmarks.load_test --base-url http://127.0.0.1:8000 \
+#       --scenario feedback --concurrency 20 --requests 500
+#   python -m benchmarks.load_test --scenario all --duration 30
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+TOPICS = ["음식 주문하기", "회의하기", "병원 예약 및 증상 말하기", "대중교통 이용하기", "물건 사기", "여행"]
+DRILLS = [
+    "오늘 날씨가 정말 좋네요",
+    "버스 정류장이 어디에 있나요",
+    "김치찌개 하나 주세요",
+    "내일 회의는 몇 시에 시작하나요",
+]
+
+
+def _feedback_body() -> dict:
+    target = random.choice(DRILLS)
+    tokens = target.split()
+    t = 0
+    words = []
+    for tok in tokens:
+        t += random.randint(50, 600)  # 단어 사이 공백
+        dur = random.randint(250, 600)
+        words.append([t, t + dur, tok])
+        t += dur
+    return {
+        "target_text": target,
+        "result_text": target if random.random() < 0.7 else " ".join(tokens[:-1]),
+        "segments": [{"start": 0, "end": t + 200, "words": words}],
+    }
+
+
+def _chat_body() -> dict:
+    if random.random() < 0.3:
+        return {"topic": random.choice(TOPICS)}  # 대화 시작
+    return {
+        "topic": random.choice(TOPICS),
+        "history": [{"role": "assistant", "content": "안녕하세요, 무엇을 도와드릴까요?"}],
+        "user_input": "추천 메뉴가 뭐예요?",
+    }
+
+
+def _learning_body() -> dict:
+    return {"type": random.choice(["word", "sentence"])}
+
+
+SCENARIOS: Dict[str, Tuple[str, Callable[[], dict]]] = {
+    "learning": ("/api/learning", _learning_body),
+    "chat": ("/api/chat", _chat_body),
+    "feedback": ("/api/feedback", _feedback_body),
+}
+
+
+@dataclass
+class Result:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    path: str,
+    make_body: Callable[[], dict],
+    *,
+    concurrency: int,
+    total_requests: int | None,
+    duration: float | None,
+) -> Result:
+    result = Result()
+    issued = 0
+    start = time.perf_counter()
+    stop_at = start + duration if duration else None
+
+    def next_ticket() -> bool:
+        nonlocal issued
+        if total_requests is not None and issued >= total_requests:
+            return False
+        if stop_at is not None and time.perf_counter() >= stop_at:
+            return False
+        issued += 1
+        return True
+
+    async def worker() -> None:
+        while next_ticket():
+            t0 = time.perf_counter()
+            try:
+                response = await client.post(path, json=make_body())
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            result.latencies.append(time.perf_counter() - t0)
+            result.statuses[status] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def report(name: str, result: Result) -> None:
+    n = len(result.latencies)
+    rps = n / result.elapsed if result.elapsed else 0.0
+    ms = lambda v: f"{v * 1000:8.1f}ms"  # noqa: E731
+    print(
+        f"[{name}] requests={n} elapsed={result.elapsed:.2f}s throughput={rps:.1f} req/s\n"
+        f"  p50={ms(_percentile(result.latencies, 50))} "
+        f"p95={ms(_percentile(result.latencies, 95))} "
+        f"p99={ms(_percentile(result.latencies, 99))} "
+        f"max={ms(max(result.latencies) if n else 0.0)}\n"
+        f"  status={dict(result.statuses)}"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        for name in names:
+            path, make_body = SCENARIOS[name]
+            result = await run_scenario(
+                client, path, make_body,
+                concurrency=args.concurrency,
+                total_requests=None if args.duration else args.requests,
+                duration=args.duration,
+            )
+            report(name, result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="talkie-ai end-to-end load test")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="시나리오별 요청 수 (--duration 지정 시 무시)")
+    parser.add_argument("--duration", type=float, default=None, help="시나리오별 실행 시간(s)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
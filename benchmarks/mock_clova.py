@@ -0,0 +1,161 @@
+# ------------------------------------------------------------
+# 로컬 Clova Studio 대역 서버 (부하 테스트용, 실제 쿼터 소모 없음)
+# - clova_client.py가 호출하는 v1/v3 chat-completions 엔드포인트 흉내
+# - 지연 분포(로그정규/고정), 5xx 오류율, 429(Retry-After) 주입 설정 가능
+# - 모델별 지연 중앙값 지정 가능 (--model-latency HCX-003=7 → 모델 라우팅 우회 확인용)
+# - Accept: text/event-stream 이면 토큰 단위 SSE로 응답
+#
+# 실행:
+#   python -m benchmarks.mock_clova --port 9000 --latency-median 0.8 --latency-sigma 0.4 \
+#       --error-rate 0.01 --throttle-rate 0.02
+#   CLOVA_BASE_URL=http://127.0.0.1:9000 CLOVA_API_KEY=dummy uvicorn app.main:app --port 8000
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class MockConfig:
+    latency_median: float = 0.8     # 응답 지연 중앙값(s)
+    latency_sigma: float = 0.4      # 로그정규 sigma (0이면 고정 지연)
+    latency_max: float = 30.0       # 지연 상한(s)
+    error_rate: float = 0.0         # 500 응답 비율
+    throttle_rate: float = 0.0      # 429 응답 비율
+    retry_after: float = 0.2        # 429 응답의 Retry-After(s)
+    stream_token_gap: float = 0.03  # 스트리밍 토큰 간 간격(s)
+    model_latency: Dict[str, float] = field(default_factory=dict)  # 모델별 지연 중앙값(s)
+
+
+config = MockConfig()
+
+WORDS = ["떡볶이", "버스", "병원", "회의", "날씨", "여행", "강아지", "영화", "책", "운동", "음악", "우산"]
+SENTENCES = [
+    "오늘 점심은 김치찌개를 먹을까요?",
+    "버스 정류장이 어디에 있는지 알려 주세요.",
+    "내일 회의는 몇 시에 시작하나요?",
+    "주말에 같이 영화 보러 갈래요?",
+    "요즘 날씨가 많이 추워졌네요.",
+]
+FEEDBACKS = [
+    "속도를 조금 늦추고 또박또박 말해 보세요.",
+    "단어를 붙여서 자연스럽게 이어 말해 보세요.",
+    "발음이 좋으니 지금 리듬을 유지하세요.",
+]
+
+
+def _latency(model: str) -> float:
+    median = config.model_latency.get(model, config.latency_median)
+    if config.latency_sigma <= 0:
+        return median
+    value = random.lognormvariate(math.log(max(median, 1e-6)), config.latency_sigma)
+    return min(value, config.latency_max)
+
+
+def _reply(messages: list[dict]) -> str:
+    system = messages[0].get("content", "") if messages else ""
+    if "단어 생성기" in system:
+        return random.choice(WORDS)
+    if "문장 생성기" in system:
+        return random.choice(SENTENCES)
+    if "피드백 생성기" in system:
+        return random.choice(FEEDBACKS)
+    return random.choice(SENTENCES)
+
+
+def _usage(messages: list[dict], content: str) -> tuple[int, int]:
+    prompt = sum(len(m.get("content", "")) for m in messages) // 2
+    return prompt, max(1, len(content) // 2)
+
+
+app = FastAPI()
+
+
+@app.post("/{version}/chat-completions/{model}")
+async def chat_completions(version: str, model: str, request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+
+    roll = random.random()
+    if roll < config.throttle_rate:
+        return JSONResponse(
+            {"status": {"code": "42901", "message": "Too many requests"}},
+            status_code=429,
+            headers={"Retry-After": str(config.retry_after)},
+        )
+    await asyncio.sleep(_latency(model))
+    if roll < config.throttle_rate + config.error_rate:
+        return JSONResponse({"status": {"code": "50000", "message": "Internal error"}}, status_code=500)
+
+    content = _reply(messages)
+    prompt_tokens, completion_tokens = _usage(messages, content)
+    if version == "v3":
+        result = {
+            "message": {"role": "assistant", "content": content},
+            "usage": {
+                "promptTokens": prompt_tokens,
+                "completionTokens": completion_tokens,
+                "totalTokens": prompt_tokens + completion_tokens,
+            },
+        }
+    else:
+        result = {
+            "message": {"role": "assistant", "content": content},
+            "inputLength": prompt_tokens,
+            "outputLength": completion_tokens,
+        }
+
+    if "text/event-stream" in request.headers.get("accept", ""):
+        async def events():
+            for ch in content:
+                token = {"message": {"role": "assistant", "content": ch}}
+                yield f"event: token\ndata: {json.dumps(token, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(config.stream_token_gap)
+            yield f"event: result\ndata: {json.dumps(result, ensure_ascii=False)}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return {"status": {"code": "20000", "message": "OK"}, "result": result}
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Clova Studio stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-median", type=float, default=config.latency_median)
+    parser.add_argument("--latency-sigma", type=float, default=config.latency_sigma)
+    parser.add_argument("--latency-max", type=float, default=config.latency_max)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--throttle-rate", type=float, default=config.throttle_rate)
+    parser.add_argument("--retry-after", type=float, default=config.retry_after)
+    parser.add_argument("--stream-token-gap", type=float, default=config.stream_token_gap)
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=SEC",
+                        help="모델별 지연 중앙값 (반복 가능)")
+    args = parser.parse_args()
+
+    config.latency_median = args.latency_median
+    config.latency_sigma = args.latency_sigma
+    config.latency_max = args.latency_max
+    config.error_rate = args.error_rate
+    config.throttle_rate = args.throttle_rate
+    config.retry_after = args.retry_after
+    config.stream_token_gap = args.stream_token_gap
+    for item in args.model_latency:
+        model, _, sec = item.partition("=")
+        config.model_latency[model] = float(sec)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
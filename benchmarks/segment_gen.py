@@ -0,0 +1,108 @@
+# ------------------------------------------------------------
+# 합성 STT 세그먼트/단어 생성기 (feedback_logic 벤치마크용)
+# - 단어 수, 세그먼트 수, 단어 길이/침묵 분포, 목표 WER을 지정해 재현 가능한 입력 생성
+# - 출력은 /api/feedback 라우터가 feedback_logic에 넘기는 형태와 동일
+#     segments: [{"start", "end", "words": [{"start", "end", "token"}, ...]}, ...]
+#   (words_format="list" 이면 [[start, end, "token"], ...])
+# ------------------------------------------------------------
+
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+from typing import List, Literal, Tuple
+
+VOCAB = [
+    "오늘", "날씨가", "정말", "좋네요", "버스", "정류장이", "어디에", "있나요", "김치찌개",
+    "하나", "주세요", "내일", "회의는", "몇", "시에", "시작하나요", "주말에", "같이", "영화",
+    "보러", "갈래요", "요즘", "많이", "추워졌네요", "병원", "예약을", "하고", "싶어요",
+]
+
+
+@dataclass
+class SegmentSpec:
+    n_words: int = 10
+    n_segments: int = 1
+    word_ms: Tuple[int, int] = (200, 600)   # 단어 길이 범위(ms, 균등)
+    pause_mean_ms: float = 150.0            # 단어 사이 침묵 평균(ms, 지수분포)
+    long_pause_rate: float = 0.05           # 긴 침묵(주저) 비율
+    long_pause_ms: Tuple[int, int] = (600, 1500)
+    wer: float = 0.0                        # 목표 WER (치환/삭제/삽입을 섞어 적용)
+    shuffled: bool = False                  # 세그먼트 순서를 섞어서 전달(정렬 비용 확인용)
+    words_format: Literal["dict", "list"] = "dict"
+
+
+@dataclass
+class Sample:
+    target_text: str
+    result_text: str
+    segments: List[dict]
+
+
+def _perturb(tokens: List[str], wer: float, rng: random.Random) -> List[str]:
+    """
+    기준 토큰에 편집 round(wer·n)번을 적용 (편집 위치가 겹치지 않아 실제 WER ≈ 목표값)
+    """
+    n_edits = min(len(tokens), int(round(wer * len(tokens))))
+    if n_edits <= 0:
+        return list(tokens)
+    out: List[str] = []
+    positions = set(rng.sample(range(len(tokens)), n_edits))
+    for i, tok in enumerate(tokens):
+        if i not in positions:
+            out.append(tok)
+            continue
+        op = rng.random()
+        if op < 0.6:
+            out.append(tok + "요")                       # 치환
+        elif op < 0.8:
+            continue                                     # 삭제
+        else:
+            out.extend((tok, rng.choice(VOCAB) + "음"))  # 삽입
+    return out
+
+
+def make_sample(spec: SegmentSpec, seed: int = 0) -> Sample:
+    rng = random.Random(seed)
+    target = [rng.choice(VOCAB) for _ in range(spec.n_words)]
+    spoken = _perturb(target, spec.wer, rng)
+
+    # 발화된 토큰에 타임스탬프 부여
+    t = rng.randint(0, 300)
+    timed = []
+    for tok in spoken:
+        dur = rng.randint(*spec.word_ms)
+        timed.append((t, t + dur, tok))
+        t += dur
+        if rng.random() < spec.long_pause_rate:
+            t += rng.randint(*spec.long_pause_ms)
+        else:
+            t += int(rng.expovariate(1.0 / spec.pause_mean_ms)) if spec.pause_mean_ms > 0 else 0
+
+    # 단어를 연속 구간으로 나눠 세그먼트 구성
+    n_seg = max(1, min(spec.n_segments, len(timed) or 1))
+    bounds = sorted(rng.sample(range(1, len(timed)), n_seg - 1)) if len(timed) > 1 and n_seg > 1 else []
+    segments = []
+    for lo, hi in zip([0] + bounds, bounds + [len(timed)]):
+        chunk = timed[lo:hi]
+        if spec.words_format == "dict":
+            words = [{"start": s, "end": e, "token": tok} for s, e, tok in chunk]
+        else:
+            words = [[s, e, tok] for s, e, tok in chunk]
+        start = chunk[0][0] if chunk else 0
+        end = chunk[-1][1] + rng.randint(0, 200) if chunk else 0
+        segments.append({"start": start, "end": end, "words": words})
+    if spec.shuffled:
+        rng.shuffle(segments)
+
+    return Sample(target_text=" ".join(target), result_text=" ".join(spoken), segments=segments)
+
+
+# 대표 입력 크기: 3단어 드릴 ~ 2분 분량 문단 낭독
+SIZES = {
+    "drill_3w": SegmentSpec(n_words=3, n_segments=1),
+    "sentence_12w": SegmentSpec(n_words=12, n_segments=1, wer=0.1),
+    "paragraph_60w": SegmentSpec(n_words=60, n_segments=4, wer=0.1),
+    "reading_250w": SegmentSpec(n_words=250, n_segments=12, wer=0.1, long_pause_rate=0.08),
+    "reading_250w_wer40": SegmentSpec(n_words=250, n_segments=12, wer=0.4),
+    "reading_250w_shuffled": SegmentSpec(n_words=250, n_segments=12, wer=0.1, shuffled=True),
+}